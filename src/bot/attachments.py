@@ -2,20 +2,57 @@ from __future__ import annotations
 
 import asyncio
 import base64
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Literal, Sequence
 
 import structlog
 from telegram import Message, Update
 
+try:  # SIMD base64 when available; the stdlib encoder is the fallback
+    import pybase64
+except ImportError:  # pragma: no cover - exercised only without pybase64
+    pybase64 = None  # type: ignore[assignment]
+
 logger = structlog.get_logger(__name__)
 
-_IMAGE_SIGNATURES: tuple[tuple[bytes, str], ...] = (
-    (b"\x89PNG\r\n\x1a\n", "image/png"),
-    (b"\xff\xd8\xff", "image/jpeg"),
-    (b"GIF87a", "image/gif"),
-    (b"GIF89a", "image/gif"),
-    (b"RIFF", "image/webp"),
+_b64encode = pybase64.b64encode if pybase64 is not None else base64.standard_b64encode
+
+# (signature, media type, file extension)
+_IMAGE_SIGNATURES: tuple[tuple[bytes, str, str], ...] = (
+    (b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+    (b"\xff\xd8\xff", "image/jpeg", "jpeg"),
+    (b"GIF87a", "image/gif", "gif"),
+    (b"GIF89a", "image/gif", "gif"),
+    (b"RIFF", "image/webp", "webp"),
+)
+
+# Signatures grouped by lead byte. Every lead byte belongs to a single media
+# type, so one bytes.startswith(tuple) call settles detection.
+_SIGNATURES_BY_LEAD_BYTE: dict[int, tuple[tuple[bytes, ...], tuple[str, str]]] = {
+    signature[0]: (
+        tuple(other for other, _, _ in _IMAGE_SIGNATURES if other[0] == signature[0]),
+        (media_type, ext),
+    )
+    for signature, media_type, ext in _IMAGE_SIGNATURES
+}
+
+# Chunk size for encoding large attachments. A multiple of 3, so each chunk
+# encodes to whole base64 quanta and the pieces concatenate without padding.
+_B64_CHUNK_SIZE = 3 * 1024 * 1024
+
+# How much of an unclassified document to scan for NUL bytes before trying
+# a full UTF-8 decode.
+_BINARY_SNIFF_SIZE = 4096
+
+# Non-text/* MIME types that carry plain text
+_TEXT_MIME_TYPES: frozenset[str] = frozenset(
+    {
+        "application/json",
+        "application/xml",
+        "application/x-yaml",
+        "application/yaml",
+        "application/toml",
+    }
 )
 
 _TEXT_EXTENSIONS: frozenset[str] = frozenset(
@@ -84,30 +121,90 @@ _TEXT_EXTENSIONS: frozenset[str] = frozenset(
 )
 
 
-def _detect_image_media_type(data: bytes) -> str | None:
-    """Check magic bytes to detect image media type. Returns None if not an image."""
-    for signature, media_type in _IMAGE_SIGNATURES:
-        if data.startswith(signature):
-            return media_type
+def _detect_image_type(data: bytes | bytearray) -> tuple[str, str] | None:
+    """Check magic bytes for an image. Returns (media_type, extension) or None."""
+    if not data:
+        return None
+    entry = _SIGNATURES_BY_LEAD_BYTE.get(data[0])
+    if entry is not None and data.startswith(entry[0]):
+        return entry[1]
     return None
 
 
+def _encode_b64_ascii(data: bytes | bytearray) -> str:
+    """Base64-encode raw attachment bytes into the str the API expects.
+
+    Large buffers (typically PDFs) are encoded in chunks over a memoryview so
+    no single full-size intermediate bytes object is allocated.
+    """
+    if len(data) <= _B64_CHUNK_SIZE:
+        return _b64encode(data).decode("ascii")
+    with memoryview(data) as view:
+        return "".join(
+            _b64encode(view[start : start + _B64_CHUNK_SIZE]).decode("ascii")
+            for start in range(0, len(view), _B64_CHUNK_SIZE)
+        )
+
+
 def _file_extension(filename: str) -> str:
     """Extract lowercase extension without leading dot. Returns empty string if none."""
-    if "." not in filename:
+    dot = filename.rfind(".")
+    if dot < 0:
         return ""
-    return filename.rsplit(".", 1)[-1].lower()
+    return filename[dot + 1 :].lower()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Attachment:
-    content_block: dict[str, Any]  # Anthropic API content block
+    """A processed upload, convertible to an Anthropic API content block.
+
+    ``data`` holds either the raw download (sent as a base64 source) or the
+    already-decoded text of a text document. Base64 sources are encoded the
+    first time ``content_block`` is read, so attachments that never reach
+    Claude skip the encode entirely.
+    """
+
     filename: str
     size: int
     media_type: str
+    kind: Literal["image", "document"]
+    data: bytes | bytearray | str = field(repr=False)
+    _content_block: dict[str, Any] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def content_block(self) -> dict[str, Any]:
+        """Anthropic API content block for this attachment (built once)."""
+        block = self._content_block
+        if block is None:
+            block = self._build_content_block()
+            object.__setattr__(self, "_content_block", block)
+        return block
+
+    def _build_content_block(self) -> dict[str, Any]:
+        """Build the block as a single literal per block shape."""
+        if isinstance(self.data, str):
+            return {
+                "type": "document",
+                "source": {
+                    "type": "text",
+                    "media_type": "text/plain",
+                    "data": self.data,
+                },
+                "title": self.filename,
+            }
+        source = {
+            "type": "base64",
+            "media_type": self.media_type,
+            "data": _encode_b64_ascii(self.data),
+        }
+        if self.kind == "image":
+            return {"type": "image", "source": source}
+        return {"type": "document", "source": source, "title": self.filename}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Query:
     text: str | None = None
     attachments: tuple[Attachment, ...] = ()
@@ -137,22 +234,39 @@ class AttachmentProcessor:
 
     async def process(self, message: Message) -> Attachment:
         """Process a Telegram message's photo or document into an Attachment."""
-        if message.photo:
+        photo, document = message.photo, message.document
+        if photo:
             return await self._process_photo(message)
-        if message.document:
+        if document:
             return await self._process_document(message)
         raise ValueError("Message contains no photo or document")
 
+    async def process_many(self, messages: Sequence[Message]) -> list[Attachment]:
+        """Process several messages (e.g. an album) with concurrent downloads.
+
+        Results keep the order of ``messages``. The first failure propagates
+        after the remaining downloads are cancelled.
+        """
+        tasks = [asyncio.create_task(self.process(m)) for m in messages]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
     async def _process_photo(self, message: Message) -> Attachment:
         """Process a Telegram photo (picks the largest size)."""
         # photo is a tuple of PhotoSize from smallest to largest
         photo_size = message.photo[-1]
         tg_file = await photo_size.get_file()
-        data = bytes(await tg_file.download_as_bytearray())
+        # PTB hands back a contiguous bytearray; every consumer below accepts
+        # it directly, so skip the full-size bytes() copy.
+        data = await tg_file.download_as_bytearray()
 
-        media_type = _detect_image_media_type(data) or "image/jpeg"
-        encoded = base64.standard_b64encode(data).decode()
-        filename = f"photo.{media_type.split('/')[-1]}"
+        media_type, ext = _detect_image_type(data) or ("image/jpeg", "jpeg")
+        filename = f"photo.{ext}"
 
         logger.debug(
             "processed_photo",
@@ -161,19 +275,12 @@ class AttachmentProcessor:
             size=len(data),
         )
 
-        content_block: dict[str, Any] = {
-            "type": "image",
-            "source": {
-                "type": "base64",
-                "media_type": media_type,
-                "data": encoded,
-            },
-        }
         return Attachment(
-            content_block=content_block,
             filename=filename,
             size=len(data),
             media_type=media_type,
+            kind="image",
+            data=data,
         )
 
     async def _process_document(self, message: Message) -> Attachment:
@@ -184,20 +291,12 @@ class AttachmentProcessor:
         mime_type: str | None = doc.mime_type
 
         tg_file = await doc.get_file()
-        data = bytes(await tg_file.download_as_bytearray())
+        data = await tg_file.download_as_bytearray()
 
         # 1. Check magic bytes for images first (overrides MIME)
-        detected_image_type = _detect_image_media_type(data)
-        if detected_image_type:
-            encoded = base64.standard_b64encode(data).decode()
-            content_block: dict[str, Any] = {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": detected_image_type,
-                    "data": encoded,
-                },
-            }
+        detected_image = _detect_image_type(data)
+        if detected_image:
+            detected_image_type = detected_image[0]
             logger.debug(
                 "processed_image_document",
                 filename=filename,
@@ -205,23 +304,15 @@ class AttachmentProcessor:
                 size=len(data),
             )
             return Attachment(
-                content_block=content_block,
                 filename=filename,
                 size=len(data),
                 media_type=detected_image_type,
+                kind="image",
+                data=data,
             )
 
         # 2. MIME says image
         if mime_type and mime_type.startswith("image/"):
-            encoded = base64.standard_b64encode(data).decode()
-            content_block = {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": mime_type,
-                    "data": encoded,
-                },
-            }
             logger.debug(
                 "processed_image_document_by_mime",
                 filename=filename,
@@ -229,54 +320,35 @@ class AttachmentProcessor:
                 size=len(data),
             )
             return Attachment(
-                content_block=content_block,
                 filename=filename,
                 size=len(data),
                 media_type=mime_type,
+                kind="image",
+                data=data,
             )
 
         # 3. PDF: magic bytes or MIME
         if (mime_type == "application/pdf") or data.startswith(b"%PDF-"):
-            encoded = base64.standard_b64encode(data).decode()
-            content_block = {
-                "type": "document",
-                "source": {
-                    "type": "base64",
-                    "media_type": "application/pdf",
-                    "data": encoded,
-                },
-                "title": filename,
-            }
             logger.debug(
                 "processed_pdf_document",
                 filename=filename,
                 size=len(data),
             )
             return Attachment(
-                content_block=content_block,
                 filename=filename,
                 size=len(data),
                 media_type="application/pdf",
+                kind="document",
+                data=data,
             )
 
         # 4. Text MIME or known text extension
         ext = _file_extension(filename)
         is_text_mime = mime_type is not None and (
-            mime_type.startswith("text/") or mime_type == "application/json"
+            mime_type.startswith("text/") or mime_type in _TEXT_MIME_TYPES
         )
-        is_text_ext = ext in _TEXT_EXTENSIONS
 
-        if is_text_mime or is_text_ext:
-            text_content = data.decode("utf-8")
-            content_block = {
-                "type": "document",
-                "source": {
-                    "type": "text",
-                    "media_type": "text/plain",
-                    "data": text_content,
-                },
-                "title": filename,
-            }
+        if is_text_mime or ext in _TEXT_EXTENSIONS:
             logger.debug(
                 "processed_text_document",
                 filename=filename,
@@ -285,37 +357,23 @@ class AttachmentProcessor:
                 size=len(data),
             )
             return Attachment(
-                content_block=content_block,
                 filename=filename,
                 size=len(data),
                 media_type=mime_type or "text/plain",
+                kind="document",
+                data=data.decode("utf-8"),
             )
 
-        # 5. Last resort: try UTF-8 decode
-        try:
-            text_content = data.decode("utf-8")
-            content_block = {
-                "type": "document",
-                "source": {
-                    "type": "text",
-                    "media_type": "text/plain",
-                    "data": text_content,
-                },
-                "title": filename,
-            }
-            logger.debug(
-                "processed_unknown_as_text",
-                filename=filename,
-                mime_type=mime_type,
-                size=len(data),
-            )
-            return Attachment(
-                content_block=content_block,
-                filename=filename,
-                size=len(data),
-                media_type="text/plain",
-            )
-        except UnicodeDecodeError:
+        # 5. Last resort: try UTF-8 decode. A NUL byte near the start is a
+        # reliable binary marker and saves walking the whole buffer first.
+        text_content: str | None = None
+        if data.find(b"\x00", 0, _BINARY_SNIFF_SIZE) < 0:
+            try:
+                text_content = data.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+
+        if text_content is None:
             logger.warning(
                 "unsupported_binary_attachment",
                 filename=filename,
@@ -323,15 +381,37 @@ class AttachmentProcessor:
             )
             raise UnsupportedAttachmentError(filename, mime_type)
 
+        logger.debug(
+            "processed_unknown_as_text",
+            filename=filename,
+            mime_type=mime_type,
+            size=len(data),
+        )
+        return Attachment(
+            filename=filename,
+            size=len(data),
+            media_type="text/plain",
+            kind="document",
+            data=text_content,
+        )
+
+
+@dataclass(slots=True)
+class _AlbumGroup:
+    """Buffered items of one album and when its collection window closes."""
+
+    updates: list[Update]
+    deadline: float
+    ready: bool = False
+
 
 class MediaGroupCollector:
     """Buffer Telegram album items and group them by media_group_id."""
 
     def __init__(self, timeout: float = 1.0) -> None:
         self._timeout = timeout
-        self._pending: dict[str, list[Update]] = {}
-        self._timers: dict[str, asyncio.Task[None]] = {}
-        self._ready: dict[str, list[Update]] = {}
+        self._groups: dict[str, _AlbumGroup] = {}
+        self._sweeper: asyncio.Task[None] | None = None
 
     async def add(self, update: Update) -> list[Update] | None:
         """Add an update. Returns immediately for non-album messages.
@@ -343,26 +423,40 @@ class MediaGroupCollector:
         if group_id is None:
             return [update]
 
-        if group_id not in self._pending:
-            self._pending[group_id] = []
-
-        self._pending[group_id].append(update)
-
-        # Cancel existing timer and start a fresh one (sliding window)
-        existing = self._timers.get(group_id)
-        if existing is not None and not existing.done():
-            existing.cancel()
-
-        self._timers[group_id] = asyncio.create_task(self._fire_timeout(group_id))
+        # Sliding window: each item pushes the group's deadline back. A single
+        # sweeper task serves every group instead of one timer per item.
+        deadline = asyncio.get_running_loop().time() + self._timeout
+        group = self._groups.get(group_id)
+        if group is None:
+            self._groups[group_id] = _AlbumGroup([update], deadline)
+        else:
+            # A straggler arriving after the window closed reopens the group
+            group.updates.append(update)
+            group.deadline = deadline
+            group.ready = False
+
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
         return None
 
-    async def _fire_timeout(self, group_id: str) -> None:
-        """Wait for timeout, then move pending group to ready."""
-        await asyncio.sleep(self._timeout)
-        if group_id in self._pending:
-            self._ready[group_id] = self._pending.pop(group_id)
-            self._timers.pop(group_id, None)
+    async def _sweep(self) -> None:
+        """Mark groups whose window has elapsed as ready; exit once idle."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [group for group in self._groups.values() if not group.ready]
+            if not pending:
+                return
+            deadline = min(group.deadline for group in pending)
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            now = loop.time()
+            for group in self._groups.values():
+                if not group.ready and group.deadline <= now:
+                    group.ready = True
 
     def pop_ready(self, group_id: str) -> list[Update] | None:
         """Pop a completed group if ready, else None."""
-        return self._ready.pop(group_id, None)
+        group = self._groups.get(group_id)
+        if group is None or not group.ready:
+            return None
+        del self._groups[group_id]
+        return group.updates
@@ -113,6 +113,16 @@ class ClaudeCodeBot:
             await self.app.bot.set_my_commands(commands)
             logger.info("Bot commands set", commands=[cmd.command for cmd in commands])
 
+    def _seed_bot_data(self) -> None:
+        """Copy dependencies into ``bot_data`` before the first update.
+
+        Runs at start rather than initialize because some dependencies
+        are only added once the Telegram application exists.
+        """
+        self.app.bot_data.update(self.deps)
+        self.app.bot_data["settings"] = self.settings
+        self.orchestrator.bind_dependencies(self.app.bot_data)
+
     def _register_handlers(self) -> None:
         """Register handlers via orchestrator (mode-aware)."""
         self.orchestrator.register_handlers(self.app)
@@ -166,8 +176,7 @@ class ClaudeCodeBot:
                 raise ApplicationHandlerStop
 
             # Inject dependencies into context
-            for key, value in self.deps.items():
-                context.bot_data[key] = value
+            context.bot_data.update(self.deps)
             context.bot_data["settings"] = self.settings
 
             # Track whether the middleware allowed the request through
@@ -195,6 +204,7 @@ class ClaudeCodeBot:
             return
 
         await self.initialize()
+        self._seed_bot_data()
 
         logger.info(
             "Starting bot", mode="webhook" if self.settings.webhook_url else "polling"
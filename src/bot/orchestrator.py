@@ -8,13 +8,20 @@ from __future__ import annotations
 
 import asyncio
 import os
+import re
 import signal
 import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import structlog
-from telegram import BotCommand, InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import (
+    BotCommand,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+    Update,
+)
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
@@ -24,35 +31,318 @@ from telegram.ext import (
     filters,
 )
 
-if TYPE_CHECKING:
-    from ..claude.sdk_integration import ClaudeResponse
-    from .attachments import Query
-
 from ..claude.client_manager import ClientManager
 from ..claude.history import (
+    DEFAULT_HISTORY_PATH,
     append_history_entry,
     check_history_format_health,
     filter_by_directory,
     read_claude_history,
     read_first_message,
+    read_history_index,
     read_session_transcript,
 )
+from ..claude.sdk_integration import ClaudeResponse
 from ..claude.user_client import QueryInterruptedError
 from ..config.settings import Settings
 from ..projects.lifecycle import TopicLifecycleManager
+from .attachments import (
+    AttachmentProcessor,
+    MediaGroupCollector,
+    Query,
+    UnsupportedAttachmentError,
+)
+from .handlers.message import (
+    _format_error_message,
+    _update_working_directory_from_claude_response,
+)
 from .progress import ProgressMessageManager, build_stream_callback
+from .utils.formatting import FormattedMessage, ResponseFormatter
 from .utils.html_format import escape_html
 from .utils.repo_browser import (
     build_browse_header,
     build_browser_keyboard,
     is_branch_dir,
-    list_visible_children,
+    list_browse_entries,
     resolve_browse_path,
+    scan_browse_entries,
 )
 from .utils.time_format import relative_time
 
 logger = structlog.get_logger()
 
+# Bot commands and the orchestrator methods that handle them
+_COMMAND_HANDLERS: tuple[tuple[str, str], ...] = (
+    ("start", "handle_start"),
+    ("new", "handle_new"),
+    ("interrupt", "handle_interrupt"),
+    ("status", "handle_status"),
+    ("compact", "handle_compact"),
+    ("model", "handle_model"),
+    ("repo", "handle_repo"),
+    ("resume", "handle_resume"),
+    ("commands", "handle_commands"),
+    ("remove", "handle_remove"),
+    ("history", "handle_history"),
+    ("restart", "handle_restart"),
+)
+_REGISTERED_COMMANDS = frozenset(cmd for cmd, _ in _COMMAND_HANDLERS)
+
+# Leading "/name" of a message; matches what split()[0] would give without
+# copying the rest of the (possibly long) message
+_SLASH_COMMAND_RE = re.compile(r"/\s*(\S+)")
+
+# /repo listing decorations
+_GIT_ICON = "\U0001f4e6"
+_DIR_ICON = "\U0001f4c1"
+_BRANCH_MARKER = " \u25b6"
+
+# /model picker; telegram objects are immutable, so one instance is shared
+_MODEL_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [
+            InlineKeyboardButton("Sonnet", callback_data="model:sonnet"),
+            InlineKeyboardButton("Opus", callback_data="model:opus"),
+            InlineKeyboardButton("Haiku", callback_data="model:haiku"),
+        ],
+        [
+            InlineKeyboardButton("Sonnet 1M", callback_data="model:sonnet:1m"),
+            InlineKeyboardButton("Opus 1M", callback_data="model:opus:1m"),
+        ],
+    ]
+)
+_MODEL_LABELS = {"sonnet": "Sonnet", "opus": "Opus", "haiku": "Haiku"}
+
+# Command menus per scope; static, so built once at import
+_BOT_COMMANDS: Dict[str, tuple[BotCommand, ...]] = {
+    "private": (
+        BotCommand("start", "Start the bot"),
+        BotCommand("new", "Start a fresh session"),
+        BotCommand("interrupt", "Interrupt running query"),
+        BotCommand("status", "Show session status"),
+        BotCommand("compact", "Compress context"),
+        BotCommand("model", "Switch Claude model"),
+        BotCommand("repo", "List repos / switch workspace"),
+        BotCommand("resume", "Choose a session to resume"),
+        BotCommand("commands", "Browse available skills"),
+        BotCommand("history", "Show session transcript"),
+    ),
+    "group": (
+        BotCommand("start", "Create a project topic"),
+        BotCommand("new", "New topic for same project"),
+        BotCommand("interrupt", "Interrupt running query"),
+        BotCommand("status", "Show active sessions"),
+        BotCommand("compact", "Compress context"),
+        BotCommand("model", "Switch Claude model"),
+        BotCommand("commands", "Browse available skills"),
+        BotCommand("history", "Show session transcript"),
+        BotCommand("remove", "Delete this topic"),
+    ),
+}
+
+# Last row of every /resume picker
+_NEW_SESSION_BUTTON = InlineKeyboardButton("+ New Session", callback_data="session:new")
+
+# Fixed replies shared by the callback handlers
+_MSG_NEW_SESSION = "New session started. Ready."
+_MSG_ACCESS_DENIED = "Access denied."
+_SESSION_RESUMED_HEADER = "\U0001f4c2 <b>Session resumed. Ready.</b>\n"
+_RECENT_LABEL = "<b>Recent:</b>"
+
+
+def _not_found_msg(name: str) -> str:
+    """Reply for a directory name that does not resolve to a directory."""
+    return f"Directory not found: <code>{escape_html(name)}</code>"
+
+
+def _skill_button(cmd: dict) -> InlineKeyboardButton:
+    """Build the /commands button for one skill.
+
+    Skills that take arguments prefill ``/name `` in the input field
+    instead of running immediately.
+    """
+    name = cmd["name"]
+    if cmd.get("argumentHint"):
+        return InlineKeyboardButton(
+            f"{name} ...", switch_inline_query_current_chat=f"/{name} "
+        )
+    return InlineKeyboardButton(name, callback_data=f"skill:{name}")
+
+
+# /start welcome; only the user's name and working directory vary
+_WELCOME_TEMPLATE = (
+    "Hi {name}! I'm your AI coding assistant.\n"
+    "Just tell me what you need — I can read, write, and run code.\n\n"
+    "Working in: <code>{directory}/</code>\n\n"
+    "<b>Commands:</b>\n"
+    "/new — Start fresh session\n"
+    "/interrupt — Interrupt running query\n"
+    "/status — Current session info\n"
+    "/model — Switch Claude model\n"
+    "/commands — Browse available skills\n"
+    "/compact — Compress context\n"
+    "/repo — Switch workspace"
+)
+
+# /compact: summarise the session, then seed a fresh one with the summary
+_COMPACT_SUMMARY_PROMPT = (
+    "Summarize our conversation so far concisely. Include: "
+    "key decisions, current state of work, pending tasks, "
+    "and important context. Format as bullet points."
+)
+_COMPACT_RESEED_TEMPLATE = (
+    "This is a compacted session. Here is the context from our "
+    "previous conversation:\n\n{summary}\n\n"
+    "We're continuing our work. Reply with just OK."
+)
+
+# Thread-routing classes, keyed by handler ``__name__``
+_MANAGEMENT_BYPASS_HANDLERS = frozenset({"sync_threads", "handle_remove"})
+_START_BYPASS_HANDLERS = frozenset({"start_command", "handle_start"})
+_GENERAL_ALLOWED_HANDLERS = frozenset(
+    {"start_command", "handle_start", "handle_status", "_handle_callback"}
+)
+
+
+# Callback data prefixes dispatched by _handle_callback
+_CALLBACK_PREFIXES = (
+    "cd:",
+    "nav:",
+    "sel:",
+    "start_nav:",
+    "start_sel:",
+    "start_ses:",
+    "session:",
+    "skill:",
+    "model:",
+    "remove_confirm:",
+    "remove_cancel",
+)
+
+
+def _is_orchestrator_callback(data: object) -> bool:
+    """CallbackQueryHandler pattern: a plain prefix test, no regex engine."""
+    return isinstance(data, str) and data.startswith(_CALLBACK_PREFIXES)
+
+
+def _extract_message_thread_id(update: Update) -> Optional[int]:
+    """Extract topic/thread id from update message for forum/direct topics."""
+    message = update.effective_message
+    if message is None:
+        return None
+    message_thread_id = message.message_thread_id
+    if isinstance(message_thread_id, int) and message_thread_id > 0:
+        return message_thread_id
+    dm_topic = message.direct_messages_topic
+    if dm_topic is not None:
+        topic_id = dm_topic.topic_id
+        if isinstance(topic_id, int) and topic_id > 0:
+            return topic_id
+    return None
+
+
+def _discard_result(task: "asyncio.Task[Any]") -> None:
+    """Retrieve a fire-and-forget task's outcome so errors are not logged."""
+    if not task.cancelled():
+        task.exception()
+
+
+_GIT_BADGE = " (git)"
+
+
+def _is_git_checkout(path: Path) -> bool:
+    """Return True if path holds a ``.git`` entry."""
+    # .git is a directory, or a file for worktrees and submodules
+    return os.path.exists(os.path.join(path, ".git"))
+
+
+def _git_badge(path: Path) -> str:
+    """Return the " (git)" badge if path is a git checkout, else ""."""
+    return _GIT_BADGE if _is_git_checkout(path) else ""
+
+
+def _chat_key(chat: Any) -> Any:
+    """Identify a chat across Chat objects built from different updates."""
+    return getattr(chat, "id", None) or id(chat)
+
+
+class _TypingTicker:
+    """Send typing indicators for every active query from shared timers.
+
+    One ``loop.call_later`` timer per interval serves all registered
+    chats, instead of one timer per in-flight query. A chat with several
+    queries gets a single send per tick, and a tick skips any chat whose
+    previous send has not finished or that streamed within the interval.
+    """
+
+    def __init__(self) -> None:
+        self._groups: Dict[float, Dict["asyncio.Future[None]", Any]] = {}
+        self._timers: Dict[float, asyncio.TimerHandle] = {}
+        self._sending: Dict[Any, "asyncio.Task[Any]"] = {}
+        self._last_activity: Dict[Any, float] = {}
+
+    def register(self, chat: Any, interval: float) -> "asyncio.Future[None]":
+        """Add *chat* to the ticker until the returned future is cancelled."""
+        loop = asyncio.get_running_loop()
+        handle: "asyncio.Future[None]" = loop.create_future()
+        self._groups.setdefault(interval, {})[handle] = chat
+        if interval not in self._timers:
+            self._timers[interval] = loop.call_later(
+                interval, self._tick, loop, interval
+            )
+        handle.add_done_callback(lambda h: self._unregister(h, interval))
+        return handle
+
+    def mark_active(self, chat: Any) -> None:
+        """Record a stream event for *chat*; the next tick may skip it."""
+        self._last_activity[_chat_key(chat)] = asyncio.get_running_loop().time()
+
+    def _tick(self, loop: asyncio.AbstractEventLoop, interval: float) -> None:
+        group = self._groups.get(interval)
+        if not group:
+            self._timers.pop(interval, None)
+            return
+        chats = {_chat_key(chat): chat for chat in group.values()}
+        now = loop.time()
+        for key, chat in chats.items():
+            # Progress edits are already showing activity
+            last_activity = self._last_activity.get(key)
+            if last_activity is not None and now - last_activity < interval:
+                continue
+            pending = self._sending.get(key)
+            # Skip a beat rather than stack sends behind a slow one
+            if pending is not None and not pending.done():
+                continue
+            try:
+                task = loop.create_task(chat.send_action("typing"))
+            except Exception:
+                continue
+            task.add_done_callback(_discard_result)
+            self._sending[key] = task
+        self._timers[interval] = loop.call_later(interval, self._tick, loop, interval)
+
+    def _unregister(self, handle: "asyncio.Future[None]", interval: float) -> None:
+        group = self._groups.get(interval, {})
+        chat = group.pop(handle, None)
+        if not group:
+            self._groups.pop(interval, None)
+            timer = self._timers.pop(interval, None)
+            if timer is not None:
+                timer.cancel()
+        if chat is None:
+            return
+        key = _chat_key(chat)
+        still_active = any(
+            _chat_key(other) == key
+            for members in self._groups.values()
+            for other in members.values()
+        )
+        if not still_active:
+            self._last_activity.pop(key, None)
+            task = self._sending.pop(key, None)
+            if task is not None:
+                task.cancel()
+
 
 class MessageOrchestrator:
     """Routes messages based on mode. Single entry point for all Telegram updates."""
@@ -60,54 +350,108 @@ class MessageOrchestrator:
     def __init__(self, settings: Settings, deps: Dict[str, Any]):
         self.settings = settings
         self.deps = deps
-        from .attachments import MediaGroupCollector
-
         self._media_collector = MediaGroupCollector()
+        self._typing = _TypingTicker()
+        # Both are stateless per request, so one instance serves every update
+        self._formatter = ResponseFormatter(settings)
+        self._attachment_processor = AttachmentProcessor()
+        # Strong references to fire-and-forget work until it finishes
+        self._background_tasks: set[asyncio.Task[Any]] = set()
+        # Callback data prefix -> handler, see _handle_callback
+        self._callback_handlers: Dict[
+            str,
+            Callable[[Update, ContextTypes.DEFAULT_TYPE, str], Awaitable[None]],
+        ] = {
+            "model": self.handle_model_callback,
+            "remove_confirm": self._handle_remove_confirm_callback,
+            "remove_cancel": self._handle_remove_cancel_callback,
+            "skill": self._handle_skill_callback,
+            "nav": self._handle_nav_callback,
+            "sel": self._handle_sel_callback,
+            "start_nav": self._handle_start_nav_callback,
+            "start_sel": self._handle_start_sel_callback,
+            "start_ses": self._handle_start_ses_callback,
+            "session": self._handle_session_callback,
+            "cd": self._handle_cd_callback,
+        }
+        # (user_id, callback data) of callbacks still being handled
+        self._inflight_callbacks: set[tuple[int, str]] = set()
+        # "New Session" connects still in flight, per chat key
+        self._pending_connects: Dict[tuple[int, int, int], asyncio.Task[None]] = {}
+        # Per-turn handles cached by bind_dependencies(); until then the
+        # hot paths read them from context.bot_data.
+        self._client_manager: Optional[ClientManager] = None
+        self._storage: Any = None
+        self._audit_logger: Any = None
+
+        # approved_directories re-parses and resolves its paths on every
+        # access, so resolve the roots once here and reuse them.
+        approved_dirs = settings.approved_directories
+        self._approved_roots: List[Path] = approved_dirs
+        self._approved_root_set: frozenset[Path] = frozenset(approved_dirs)
+        self._default_directory = approved_dirs[0]
+        self._approved_dir_str = str(settings.approved_directory)
+        # (root + separator, root); Settings rejects overlapping roots, so at
+        # most one prefix matches any path
+        self._workspace_prefixes: tuple[tuple[str, Path], ...] = tuple(
+            (str(root).rstrip(os.sep) + os.sep, root) for root in approved_dirs
+        )
 
     def _inject_deps(self, handler: Callable) -> Callable:  # type: ignore[type-arg]
-        """Wrap handler to inject dependencies into context.bot_data."""
+        """Wrap handler with per-update thread routing.
+
+        Dependencies are seeded into ``bot_data`` once by
+        ``ClaudeCodeBot`` before polling starts; the routing class of the
+        handler is fixed at wrap time since its name never changes.
+        """
+        name = handler.__name__
+        is_management_bypass = name in _MANAGEMENT_BYPASS_HANDLERS
+        # Per-handler routing decisions for the General topic and for
+        # project topics; only the topic kind varies between updates.
+        blocked_in_general = not is_management_bypass and (
+            name not in _GENERAL_ALLOWED_HANDLERS
+        )
+        enforce_in_general = not is_management_bypass and (
+            name not in _START_BYPASS_HANDLERS
+        )
+        enforce_in_topic = not is_management_bypass
+        answers_callback = name == "_handle_callback"
 
         async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            for key, value in self.deps.items():
-                context.bot_data[key] = value
-            context.bot_data["settings"] = self.settings
-            context.user_data.pop("_thread_context", None)
-
-            is_management_bypass = handler.__name__ in {"sync_threads", "handle_remove"}
-            is_start_bypass = handler.__name__ in {"start_command", "handle_start"}
-            is_general_allowed = handler.__name__ in {
-                "start_command",
-                "handle_start",
-                "handle_status",
-                "_handle_callback",
-            }
-            message_thread_id = self._extract_message_thread_id(update)
+            user_data = context.user_data
+
+            if answers_callback:
+                # Stop the button spinner before any routing lookups
+                await update.callback_query.answer()
 
             chat = update.effective_chat
             is_supergroup = chat is not None and chat.type == "supergroup"
 
             if is_supergroup:
-                # Supergroup with topics — enforce thread routing
+                # Supergroup with topics — enforce thread routing. Not every
+                # path below sets a fresh thread context, so drop the last one.
+                user_data.pop("_thread_context", None)
+                message_thread_id = _extract_message_thread_id(update)
                 in_general = not message_thread_id
 
                 # Block commands not allowed in General topic
-                if in_general and not is_management_bypass and not is_general_allowed:
+                if in_general and blocked_in_general:
                     if update.effective_message:
                         await update.effective_message.reply_text(
                             "Use this command inside a project topic."
                         )
                     return
 
-                should_enforce = not is_management_bypass and not (
-                    is_start_bypass and in_general
-                )
+                should_enforce = enforce_in_general if in_general else enforce_in_topic
                 if should_enforce:
-                    allowed = await self._apply_thread_routing_context(update, context)
+                    allowed = await self._apply_thread_routing_context(
+                        update, context, message_thread_id
+                    )
                     if not allowed:
                         return
                 elif in_general:
                     # Bypassed handlers still need the General flag
-                    context.user_data["_in_general_topic"] = True
+                    user_data["_in_general_topic"] = True
                 elif message_thread_id:
                     # Bypassed handler in a project topic — set context
                     # without enforcement so /remove etc. can read it
@@ -118,18 +462,18 @@ class MessageOrchestrator:
                             await manager.resolve_directory(chat.id, message_thread_id)
                             or ""
                         )
-                    context.user_data["_thread_context"] = {
+                    user_data["_thread_context"] = {
                         "chat_id": chat.id,
                         "message_thread_id": message_thread_id,
                         "directory": directory,
                     }
             else:
-                # Private DM — set thread context for private chat
+                # Private DM — always overwrite the thread context
                 user_id = update.effective_user.id if update.effective_user else 0
-                current_dir = context.user_data.get(
-                    "current_directory", self.settings.approved_directories[0]
+                current_dir = user_data.get(
+                    "current_directory", self._default_directory
                 )
-                context.user_data["_thread_context"] = {
+                user_data["_thread_context"] = {
                     "chat_id": user_id,
                     "message_thread_id": 0,
                     "directory": str(current_dir),
@@ -140,9 +484,15 @@ class MessageOrchestrator:
         return wrapped
 
     async def _apply_thread_routing_context(
-        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        message_thread_id: Optional[int],
     ) -> bool:
-        """Enforce project-thread routing and load thread-local directory state."""
+        """Enforce project-thread routing and load thread-local directory state.
+
+        ``message_thread_id`` is the topic id the wrapper already extracted.
+        """
         manager = context.bot_data.get("project_threads_manager")
         if manager is None:
             return True  # No manager = no thread routing
@@ -152,11 +502,11 @@ class MessageOrchestrator:
         if not chat or not message:
             return False
 
-        message_thread_id = self._extract_message_thread_id(update)
+        user_data = context.user_data
 
         # General topic (no thread_id) — allow /add, /start, /status through
         if not message_thread_id:
-            context.user_data["_in_general_topic"] = True
+            user_data["_in_general_topic"] = True
             return True
 
         directory = await manager.resolve_directory(chat.id, message_thread_id)
@@ -166,13 +516,13 @@ class MessageOrchestrator:
             )
             return False
 
-        context.user_data["current_directory"] = Path(directory)
-        context.user_data["_thread_context"] = {
+        user_data["current_directory"] = Path(directory)
+        user_data["_thread_context"] = {
             "chat_id": chat.id,
             "message_thread_id": message_thread_id,
             "directory": directory,
         }
-        context.user_data.pop("_in_general_topic", None)
+        user_data.pop("_in_general_topic", None)
         return True
 
     @staticmethod
@@ -182,8 +532,13 @@ class MessageOrchestrator:
         message_thread_id: int = 0,
         parse_mode: Optional[str] = None,
         reply_markup: Any = None,
+        reply_to: Optional[Message] = None,
     ) -> Any:
-        """Send a message: post to topic in supergroups, reply in DMs."""
+        """Send a message: post to topic in supergroups, reply in DMs.
+
+        ``reply_to`` overrides ``update.message`` as the DM reply target,
+        e.g. the keyboard message of a callback query.
+        """
         chat = update.effective_chat
         if message_thread_id and chat and chat.type == "supergroup":
             return await chat.send_message(
@@ -192,33 +547,34 @@ class MessageOrchestrator:
                 parse_mode=parse_mode,
                 reply_markup=reply_markup,
             )
-        return await update.message.reply_text(
+        return await (reply_to or update.message).reply_text(
             text, parse_mode=parse_mode, reply_markup=reply_markup
         )
 
     @staticmethod
     def _is_within(path: Path, root: Path) -> bool:
-        """Return True if path is within root."""
-        try:
-            path.relative_to(root)
-            return True
-        except ValueError:
-            return False
+        """Return True if path is within root.
 
-    @staticmethod
-    def _extract_message_thread_id(update: Update) -> Optional[int]:
-        """Extract topic/thread id from update message for forum/direct topics."""
-        message = update.effective_message
-        if not message:
-            return None
-        message_thread_id = getattr(message, "message_thread_id", None)
-        if isinstance(message_thread_id, int) and message_thread_id > 0:
-            return message_thread_id
-        dm_topic = getattr(message, "direct_messages_topic", None)
-        topic_id = getattr(dm_topic, "topic_id", None) if dm_topic else None
-        if isinstance(topic_id, int) and topic_id > 0:
-            return topic_id
-        return None
+        Same lexical test as ``path.relative_to(root)`` but on the string
+        forms, so a miss costs a prefix compare rather than a ValueError.
+        """
+        path_str = str(path)
+        root_str = str(root)
+        return path_str == root_str or path_str.startswith(
+            root_str.rstrip(os.sep) + os.sep
+        )
+
+    def _approved_root(self, path: Path) -> Optional[Path]:
+        """Return the approved directory containing path, if any."""
+        path_prefix = str(path).rstrip(os.sep) + os.sep
+        return next(
+            (
+                root
+                for prefix, root in self._workspace_prefixes
+                if path_prefix.startswith(prefix)
+            ),
+            None,
+        )
 
     def _resolve_chat_key(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -231,13 +587,12 @@ class MessageOrchestrator:
         return update.effective_user.id, 0
 
     async def _reject_for_thread_mode(self, update: Update, message: str) -> None:
-        """Send a guidance response when strict thread routing rejects an update."""
+        """Send a guidance response when strict thread routing rejects an update.
+
+        Callback queries have already been answered by the routing wrapper.
+        """
         query = update.callback_query
         if query:
-            try:
-                await query.answer()
-            except Exception:
-                pass
             if query.message:
                 await query.message.reply_text(message, parse_mode="HTML")
             return
@@ -245,6 +600,16 @@ class MessageOrchestrator:
         if update.effective_message:
             await update.effective_message.reply_text(message, parse_mode="HTML")
 
+    def bind_dependencies(self, bot_data: Dict[str, Any]) -> None:
+        """Cache the per-turn dependency handles from seeded ``bot_data``.
+
+        They never change once the bot starts, so the query path reads
+        attributes instead of hashing the same keys on every turn.
+        """
+        self._client_manager = bot_data.get("client_manager")
+        self._storage = bot_data.get("storage")
+        self._audit_logger = bot_data.get("audit_logger")
+
     def register_handlers(self, app: Application) -> None:
         """Register all handlers."""
         self._register_handlers(app)
@@ -252,22 +617,8 @@ class MessageOrchestrator:
     def _register_handlers(self, app: Application) -> None:
         """Register handlers: commands + text/file/photo."""
         # Commands
-        handlers = [
-            ("start", self.handle_start),
-            ("new", self.handle_new),
-            ("interrupt", self.handle_interrupt),
-            ("status", self.handle_status),
-            ("compact", self.handle_compact),
-            ("model", self.handle_model),
-            ("repo", self.handle_repo),
-            ("resume", self.handle_resume),
-            ("commands", self.handle_commands),
-            ("remove", self.handle_remove),
-            ("history", self.handle_history),
-            ("restart", self.handle_restart),
-        ]
-
-        for cmd, handler in handlers:
+        for cmd, attr in _COMMAND_HANDLERS:
+            handler = getattr(self, attr)
             app.add_handler(CommandHandler(cmd, self._inject_deps(handler)))
 
         # Unrecognized /commands -> skill lookup + Claude fallback.
@@ -302,7 +653,7 @@ class MessageOrchestrator:
         app.add_handler(
             CallbackQueryHandler(
                 self._inject_deps(self._handle_callback),
-                pattern=r"^(cd:|nav:|sel:|start_nav:|start_sel:|start_ses:|session:|skill:|model:|remove_confirm:|remove_cancel)",
+                pattern=_is_orchestrator_callback,
             )
         )
 
@@ -310,32 +661,7 @@ class MessageOrchestrator:
 
     async def get_bot_commands(self) -> Any:
         """Return bot commands. Dict of scope->commands for private and group contexts."""
-        private_commands = [
-            BotCommand("start", "Start the bot"),
-            BotCommand("new", "Start a fresh session"),
-            BotCommand("interrupt", "Interrupt running query"),
-            BotCommand("status", "Show session status"),
-            BotCommand("compact", "Compress context"),
-            BotCommand("model", "Switch Claude model"),
-            BotCommand("repo", "List repos / switch workspace"),
-            BotCommand("resume", "Choose a session to resume"),
-            BotCommand("commands", "Browse available skills"),
-            BotCommand("history", "Show session transcript"),
-        ]
-
-        group_commands = [
-            BotCommand("start", "Create a project topic"),
-            BotCommand("new", "New topic for same project"),
-            BotCommand("interrupt", "Interrupt running query"),
-            BotCommand("status", "Show active sessions"),
-            BotCommand("compact", "Compress context"),
-            BotCommand("model", "Switch Claude model"),
-            BotCommand("commands", "Browse available skills"),
-            BotCommand("history", "Show session transcript"),
-            BotCommand("remove", "Delete this topic"),
-        ]
-
-        return {"private": private_commands, "group": group_commands}
+        return dict(_BOT_COMMANDS)
 
     # --- Handlers ---
 
@@ -364,46 +690,26 @@ class MessageOrchestrator:
         """Show model selection keyboard."""
         if not update.message:
             return
-        keyboard = InlineKeyboardMarkup(
-            [
-                [
-                    InlineKeyboardButton("Sonnet", callback_data="model:sonnet"),
-                    InlineKeyboardButton("Opus", callback_data="model:opus"),
-                    InlineKeyboardButton("Haiku", callback_data="model:haiku"),
-                ],
-                [
-                    InlineKeyboardButton("Sonnet 1M", callback_data="model:sonnet:1m"),
-                    InlineKeyboardButton("Opus 1M", callback_data="model:opus:1m"),
-                ],
-            ]
-        )
-        await update.message.reply_text("Select a model:", reply_markup=keyboard)
+        await update.message.reply_text("Select a model:", reply_markup=_MODEL_KEYBOARD)
 
     async def handle_model_callback(
-        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
     ) -> None:
         """Handle model selection callback.
 
-        Note: query.answer() is already called by _handle_callback.
+        ``value`` is the data after ``model:``, e.g. "sonnet" or "opus:1m".
+        Note: query.answer() is already called by the _inject_deps wrapper.
         """
         query = update.callback_query
-        if not query or not query.data:
-            return
-        data = query.data  # e.g. "model:sonnet" or "model:opus:1m"
-        parts = data.split(":")
-        # parts[0] = "model", parts[1] = model name, parts[2] = optional "1m"
-        if len(parts) < 2:
-            return
-        base_model = parts[1]
-        is_1m = len(parts) > 2 and parts[2] == "1m"
+        base_model, _, variant = value.partition(":")
+        is_1m = variant == "1m"
         # Encode 1M in the model name (e.g. "opus[1m]") so the CLI
         # handles extended context natively — works for both Bedrock
         # and direct API.  The separate --betas flag is API-key-only.
         model = f"{base_model}[1m]" if is_1m else base_model
 
         # Build display label
-        label_map = {"sonnet": "Sonnet", "opus": "Opus", "haiku": "Haiku"}
-        label = label_map.get(base_model, base_model)
+        label = _MODEL_LABELS.get(base_model, base_model)
         if is_1m:
             label += " 1M"
 
@@ -429,8 +735,7 @@ class MessageOrchestrator:
 
         # Supergroup General topic — show directory browser (wizard step 1)
         is_supergroup = chat is not None and chat.type == "supergroup"
-        message_thread_id = self._extract_message_thread_id(update)
-        in_general = is_supergroup and not message_thread_id
+        in_general = is_supergroup and not _extract_message_thread_id(update)
 
         if in_general:
             await self._start_wizard_dir_browser(update, context)
@@ -440,21 +745,10 @@ class MessageOrchestrator:
         current_dir = context.user_data.get(
             "current_directory", self.settings.approved_directory
         )
-        dir_display = f"<code>{current_dir}/</code>"
-
-        safe_name = escape_html(user.first_name)
         await update.message.reply_text(
-            f"Hi {safe_name}! I'm your AI coding assistant.\n"
-            f"Just tell me what you need — I can read, write, and run code.\n\n"
-            f"Working in: {dir_display}\n\n"
-            f"<b>Commands:</b>\n"
-            f"/new — Start fresh session\n"
-            f"/interrupt — Interrupt running query\n"
-            f"/status — Current session info\n"
-            f"/model — Switch Claude model\n"
-            f"/commands — Browse available skills\n"
-            f"/compact — Compress context\n"
-            f"/repo — Switch workspace",
+            _WELCOME_TEMPLATE.format(
+                name=escape_html(user.first_name), directory=current_dir
+            ),
             parse_mode="HTML",
         )
 
@@ -462,8 +756,8 @@ class MessageOrchestrator:
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Wizard step 1: show directory browser with start_ prefixed callbacks."""
-        browse_dir = self.settings.approved_directories[0]
-        multi_root = len(self.settings.approved_directories) > 1
+        browse_dir = self._default_directory
+        multi_root = len(self._approved_roots) > 1
         keyboard_rows = build_browser_keyboard(
             browse_dir, browse_dir, multi_root=multi_root
         )
@@ -576,11 +870,15 @@ class MessageOrchestrator:
         chat = update.effective_chat
         if chat and chat.type == "supergroup" and message_thread_id != 0:
             current_dir = context.user_data.get(
-                "current_directory", self.settings.approved_directories[0]
+                "current_directory", self._default_directory
             )
             manager = context.bot_data.get("project_threads_manager")
             if manager:
-                dir_name = Path(str(current_dir)).name
+                dir_name = (
+                    current_dir.name
+                    if isinstance(current_dir, Path)
+                    else Path(current_dir).name
+                )
                 existing = await manager.list_topics(chat.id)
                 existing_names = [t.topic_name for t in existing]
                 topic_name = manager.generate_topic_name(
@@ -605,9 +903,7 @@ class MessageOrchestrator:
                             directory=str(current_dir),
                             session_id=None,
                             force_new=True,
-                            approved_directory=str(
-                                self.settings.approved_directories[0]
-                            ),
+                            approved_directory=str(self._default_directory),
                         )
                         # Rename with session snippet
                         if client.session_id:
@@ -636,7 +932,7 @@ class MessageOrchestrator:
         context.user_data["force_new_session"] = True
 
         current_dir = context.user_data.get(
-            "current_directory", self.settings.approved_directories[0]
+            "current_directory", self._default_directory
         )
 
         client_manager: Optional[ClientManager] = context.bot_data.get("client_manager")
@@ -657,7 +953,7 @@ class MessageOrchestrator:
                     directory=str(current_dir),
                     session_id=None,
                     force_new=True,
-                    approved_directory=str(self.settings.approved_directories[0]),
+                    approved_directory=str(self._default_directory),
                 )
                 context.user_data["claude_session_id"] = client.session_id
                 context.user_data["force_new_session"] = False
@@ -687,9 +983,10 @@ class MessageOrchestrator:
         if not update.effective_user or not update.message:
             return
         user_id = update.effective_user.id
+        user_data = context.user_data
 
         # General topic dashboard: show all active sessions across projects
-        if context.user_data.get("_in_general_topic"):
+        if user_data.get("_in_general_topic"):
             client_manager: Optional[ClientManager] = context.bot_data.get(
                 "client_manager"
             )
@@ -711,25 +1008,17 @@ class MessageOrchestrator:
             await update.message.reply_text("No active sessions.")
             return
 
-        current_dir = context.user_data.get(
+        current_dir = user_data.get(
             "current_directory", self.settings.approved_directory
         )
         if not isinstance(current_dir, Path):
-            current_dir = Path(str(current_dir))
+            current_dir = Path(current_dir)
 
         # Determine which workspace root contains current_dir
-        workspace_root = None
-        approved_dirs = self.settings.approved_directories
-        for root in approved_dirs:
-            try:
-                current_dir.relative_to(root)
-                workspace_root = root
-                break
-            except ValueError:
-                continue
+        workspace_root = self._approved_root(current_dir)
 
         # Build workspace display
-        if workspace_root and len(approved_dirs) > 1:
+        if workspace_root and len(self._workspace_prefixes) > 1:
             # Multi-root: show which root we're in
             workspace_name = workspace_root.name
             workspace_line = f"<b>Workspace:</b> {workspace_name}\n"
@@ -739,18 +1028,14 @@ class MessageOrchestrator:
         dir_display = escape_html(str(current_dir))
 
         # Session info
-        session_id = context.user_data.get("claude_session_id")
+        session_id = user_data.get("claude_session_id")
         if session_id:
+            # Indexed parse of history.jsonl, shared until the file changes
+            history = read_history_index()
+
             # Try to get display name from history.jsonl
-            display_name = ""
-            try:
-                history_entries = read_claude_history()
-                for entry in history_entries:
-                    if entry.session_id == session_id:
-                        display_name = entry.display
-                        break
-            except Exception:
-                pass
+            entry = history.by_id.get(session_id)
+            display_name = entry.display if entry else ""
 
             if display_name:
                 session_line = f"<b>Session:</b> {escape_html(display_name[:50])}\n"
@@ -759,8 +1044,7 @@ class MessageOrchestrator:
 
             # Count available sessions for this directory
             try:
-                dir_entries = filter_by_directory(read_claude_history(), current_dir)
-                session_count = len(dir_entries)
+                session_count = history.count_for_directory(current_dir)
             except Exception:
                 session_count = 0
 
@@ -823,7 +1107,7 @@ class MessageOrchestrator:
         )
 
         current_dir = context.user_data.get(
-            "current_directory", self.settings.approved_directories[0]
+            "current_directory", self._default_directory
         )
 
         chat = update.message.chat
@@ -835,18 +1119,10 @@ class MessageOrchestrator:
 
         try:
             # Step 1: Ask Claude to summarize the conversation
-            summary_prompt = (
-                "Summarize our conversation so far concisely. Include: "
-                "key decisions, current state of work, pending tasks, "
-                "and important context. Format as bullet points."
-            )
-
             logger.info("Requesting conversation summary", user_id=user_id)
 
-            from .attachments import Query
-
             summary_response = await self._run_claude_query(
-                query=Query(text=summary_prompt),
+                query=Query(text=_COMPACT_SUMMARY_PROMPT),
                 user_id=user_id,
                 current_dir=current_dir,
                 session_id=session_id,
@@ -857,12 +1133,9 @@ class MessageOrchestrator:
 
             summary_text = summary_response.content.strip()
 
-            # Step 2: Start new session seeded with the summary
-            reseed_prompt = (
-                f"This is a compacted session. Here is the context from our "
-                f"previous conversation:\n\n{summary_text}\n\n"
-                f"Please acknowledge briefly. We're continuing our work."
-            )
+            # Step 2: Start new session seeded with the summary. The reply
+            # is discarded, so ask for the shortest possible one.
+            reseed_prompt = _COMPACT_RESEED_TEMPLATE.format(summary=summary_text)
 
             logger.info("Creating new session with summary", user_id=user_id)
 
@@ -921,14 +1194,12 @@ class MessageOrchestrator:
 
         Returns a ClaudeResponse for compatibility with existing formatting code.
         """
-        from ..claude.sdk_integration import ClaudeResponse  # noqa: F811
-
-        client_manager: Optional[ClientManager] = context.bot_data.get("client_manager")
+        client_manager = self._client_manager or context.bot_data.get("client_manager")
         if client_manager is None:
             raise RuntimeError("client_manager not available")
 
         directory = str(current_dir)
-        approved_dir = str(self.settings.approved_directory)
+        approved_dir = self._approved_dir_str
 
         # Resolve chat key from context — _run_claude_query needs the context
         # parameter that callers already pass through.
@@ -950,9 +1221,12 @@ class MessageOrchestrator:
             force_new=force_new,
         )
 
+        # The client adopts the result's session id during submit(), so note
+        # the one the stored row already carries beforehand.
+        previous_session_id = client.session_id
         result = await client.submit(query, on_stream=on_stream)
 
-        if result.session_id:
+        if result.session_id and result.session_id != previous_session_id:
             await client_manager.update_session_id(
                 user_id, chat_id, message_thread_id, directory, result.session_id
             )
@@ -965,59 +1239,92 @@ class MessageOrchestrator:
             num_turns=result.num_turns,
         )
 
-    @staticmethod
+    async def _connect_new_session(
+        self,
+        client_manager: ClientManager,
+        key: tuple[int, int, int],
+        directory: str,
+        context: ContextTypes.DEFAULT_TYPE,
+    ) -> None:
+        """Connect a fresh client for a "New Session" tap.
+
+        On failure the force_new_session flag stays set and the next
+        message connects instead.
+        """
+        user_id, chat_id, message_thread_id = key
+        try:
+            client = await client_manager.get_or_connect(
+                user_id=user_id,
+                chat_id=chat_id,
+                message_thread_id=message_thread_id,
+                directory=directory,
+                session_id=None,
+                force_new=True,
+                approved_directory=str(self._default_directory),
+            )
+        except Exception:
+            return  # Will lazy-connect on next message
+        context.user_data["claude_session_id"] = client.session_id
+        context.user_data["force_new_session"] = False
+
+    def _forget_pending_connect(
+        self, key: tuple[int, int, int], task: "asyncio.Task[None]"
+    ) -> None:
+        """Drop a finished connect unless a newer one replaced it."""
+        if self._pending_connects.get(key) is task:
+            del self._pending_connects[key]
+
     def _start_typing_heartbeat(
+        self,
         chat: Any,
         interval: float = 2.0,
-    ) -> "asyncio.Task[None]":
-        """Start a background typing indicator task.
+    ) -> "asyncio.Future[None]":
+        """Start a background typing indicator.
 
-        Sends typing every *interval* seconds, independently of
-        stream events. Cancel the returned task in a ``finally``
-        block.
+        Sends typing every *interval* seconds, skipping ticks while
+        stream events keep arriving through ``_TypingTicker.mark_active``.
+        All in-flight queries share the orchestrator's typing ticker.
+        Cancel the returned future in a ``finally`` block.
         """
-
-        async def _heartbeat() -> None:
-            try:
-                while True:
-                    await asyncio.sleep(interval)
-                    try:
-                        await chat.send_action("typing")
-                    except Exception:
-                        pass
-            except asyncio.CancelledError:
-                pass
-
-        return asyncio.create_task(_heartbeat())
+        return self._typing.register(chat, interval)
 
     async def _execute_query(
         self,
         query: "Query",
         update: Update,
         context: ContextTypes.DEFAULT_TYPE,
+        *,
+        reply_to: Optional[Message] = None,
     ) -> bool:
         """Shared query execution: progress, session, Claude call, response.
 
-        Handles steps common to both handle_text and handle_attachment:
-        client sync, directory restore, progress message, heartbeat,
-        _run_claude_query, session/history update, response formatting,
-        error handling, and reply delivery.
+        Handles steps common to handle_text, handle_attachment and skill
+        callbacks: client sync, directory restore, progress message,
+        heartbeat, _run_claude_query, session/history update, response
+        formatting, error handling, and reply delivery.
+
+        ``reply_to`` is the message replies attach to; it defaults to
+        ``update.message`` and callbacks pass ``query.message``.
 
         Returns True on success, False on error.
         """
-        from .handlers.message import (
-            _format_error_message,
-            _update_working_directory_from_claude_response,
-        )
-        from .utils.formatting import FormattedMessage, ResponseFormatter
-
+        if reply_to is None:
+            reply_to = update.message
         user_id = update.effective_user.id
         chat_id, message_thread_id = self._resolve_chat_key(update, context)
 
+        # Let a "New Session" connect finish rather than racing it with
+        # a second force_new connect
+        pending_connect = self._pending_connects.get(
+            (user_id, chat_id, message_thread_id)
+        )
+        if pending_connect is not None:
+            await pending_connect
+
         # Resolve session for THIS topic.  context.user_data is per-user
         # (not per-topic), so we must always resolve from the active client
         # or the DB — never rely on a stale value left by a different topic.
-        _cm: Optional[ClientManager] = context.bot_data.get("client_manager")
+        _cm = self._client_manager or context.bot_data.get("client_manager")
         _active = (
             _cm.get_active_client(user_id, chat_id, message_thread_id)
             if _cm
@@ -1028,7 +1335,7 @@ class MessageOrchestrator:
             context.user_data["claude_session_id"] = _active.session_id
         else:
             # No active client for this topic — load from DB
-            storage = context.bot_data.get("storage")
+            storage = self._storage or context.bot_data.get("storage")
             if storage:
                 session = await storage.load_session(chat_id, message_thread_id)
                 if session and session.session_id:
@@ -1037,7 +1344,7 @@ class MessageOrchestrator:
                     context.user_data["claude_session_id"] = None
 
         current_dir = context.user_data.get(
-            "current_directory", self.settings.approved_directories[0]
+            "current_directory", self._default_directory
         )
         session_id = context.user_data.get("claude_session_id")
 
@@ -1049,23 +1356,29 @@ class MessageOrchestrator:
             if lifecycle:
                 await lifecycle.reopen(context.bot, chat_id, message_thread_id)
 
-        chat = update.message.chat
+        chat = reply_to.chat
         await chat.send_action("typing")
 
         progress_msg = await self._post_to_topic(
-            update, "Working...", message_thread_id=message_thread_id
+            update,
+            "Working...",
+            message_thread_id=message_thread_id,
+            reply_to=reply_to,
         )
-        start_time = time.time()
+        start_time = time.monotonic()
         progress_manager = ProgressMessageManager(
             initial_message=progress_msg, start_time=start_time
         )
-        on_stream = build_stream_callback(progress_manager)
+        on_stream = build_stream_callback(
+            progress_manager, on_event=lambda: self._typing.mark_active(chat)
+        )
 
         # Check if /new was used — skip auto-resume for this first message.
         # Flag is only cleared after a successful run so retries keep the intent.
         force_new = bool(context.user_data.get("force_new_session"))
 
-        # Independent typing heartbeat — stays alive even with no stream events
+        # Typing heartbeat — keeps going with no stream events, and backs
+        # off while they arrive
         heartbeat = self._start_typing_heartbeat(chat)
 
         success = True
@@ -1084,21 +1397,25 @@ class MessageOrchestrator:
             if force_new:
                 context.user_data["force_new_session"] = False
 
-            previous_session_id = context.user_data.get("claude_session_id")
-            context.user_data["claude_session_id"] = claude_response.session_id
-
-            # Write to CLI history.jsonl so CLI /resume can discover bot sessions
-            if claude_response.session_id != previous_session_id:
+            # Only a new session id needs storing; also write it to CLI
+            # history.jsonl so CLI /resume can discover bot sessions
+            if claude_response.session_id != context.user_data.get("claude_session_id"):
+                context.user_data["claude_session_id"] = claude_response.session_id
                 current_dir = context.user_data.get(
                     "current_directory",
-                    self.settings.approved_directories[0],
+                    self._default_directory,
                 )
-                display_preview = (query.text or "")[:80]
-                append_history_entry(
-                    session_id=claude_response.session_id,
-                    display=display_preview,
-                    project=str(current_dir),
+                # Off the reply path; append_history_entry logs its own errors
+                task = asyncio.create_task(
+                    asyncio.to_thread(
+                        append_history_entry,
+                        session_id=claude_response.session_id,
+                        display=(query.text or "")[:80],
+                        project=str(current_dir),
+                    )
                 )
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
 
             # Track directory changes
             _update_working_directory_from_claude_response(
@@ -1108,8 +1425,7 @@ class MessageOrchestrator:
             # Auto-naming disabled — topics use dir_name — session_id[:8] format
 
             # Format response (no reply_markup — strip keyboards)
-            formatter = ResponseFormatter(self.settings)
-            formatted_messages = formatter.format_claude_response(
+            formatted_messages = self._formatter.format_claude_response(
                 claude_response.content
             )
 
@@ -1139,9 +1455,8 @@ class MessageOrchestrator:
                     message.text,
                     message_thread_id=message_thread_id,
                     parse_mode=message.parse_mode,
+                    reply_to=reply_to,
                 )
-                if i < len(formatted_messages) - 1:
-                    await asyncio.sleep(0.5)
             except Exception as send_err:
                 logger.warning(
                     "Failed to send HTML response, retrying as plain text",
@@ -1153,6 +1468,7 @@ class MessageOrchestrator:
                         update,
                         message.text,
                         message_thread_id=message_thread_id,
+                        reply_to=reply_to,
                     )
                 except Exception as plain_err:
                     await self._post_to_topic(
@@ -1161,6 +1477,7 @@ class MessageOrchestrator:
                         f"(Telegram error: {str(plain_err)[:150]}). "
                         f"Please try again.",
                         message_thread_id=message_thread_id,
+                        reply_to=reply_to,
                     )
 
         return success
@@ -1169,8 +1486,6 @@ class MessageOrchestrator:
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Direct Claude passthrough. Simple progress. No suggestions."""
-        from .attachments import Query
-
         user_id = update.effective_user.id
         message_text = update.message.text
 
@@ -1189,27 +1504,12 @@ class MessageOrchestrator:
         # Check if this is a skill invocation (e.g., "/skillname args")
         # Skip if it's a registered bot command — pass verbatim to CLI
         if message_text.startswith("/"):
-            parts = message_text[1:].split(None, 1)
-            if parts:
-                potential_skill_name = parts[0]
-
-                # List of registered bot commands to skip
-                registered_commands = {
-                    "start",
-                    "new",
-                    "interrupt",
-                    "status",
-                    "compact",
-                    "model",
-                    "repo",
-                    "resume",
-                    "commands",
-                    "remove",
-                    "history",
-                    "restart",
-                }
+            skill_match = _SLASH_COMMAND_RE.match(message_text)
+            if skill_match:
+                potential_skill_name = skill_match.group(1)
 
-                if potential_skill_name not in registered_commands:
+                # Registered bot commands are never skills
+                if potential_skill_name not in _REGISTERED_COMMANDS:
                     # Check cached commands from SDK — if found, log and
                     # pass verbatim. The CLI handles body loading, placeholder
                     # resolution, and prompt injection natively.
@@ -1246,7 +1546,7 @@ class MessageOrchestrator:
         success = await self._execute_query(Query(text=message_text), update, context)
 
         # Audit log
-        audit_logger = context.bot_data.get("audit_logger")
+        audit_logger = self._audit_logger or context.bot_data.get("audit_logger")
         if audit_logger:
             await audit_logger.log_command(
                 user_id=user_id,
@@ -1259,8 +1559,6 @@ class MessageOrchestrator:
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Process photo or document upload -> Claude via Query pipeline."""
-        from .attachments import AttachmentProcessor, Query, UnsupportedAttachmentError
-
         user_id = update.effective_user.id
 
         # Use MediaGroupCollector to buffer album items
@@ -1275,22 +1573,16 @@ class MessageOrchestrator:
             num_items=len(updates),
         )
 
-        # Process each message into an Attachment
-        processor = AttachmentProcessor()
-        attachments = []
-        caption: Optional[str] = None
-        for u in updates:
-            msg = u.message
-            if msg is None:
-                continue
-            if caption is None:
-                caption = msg.caption
-            try:
-                att = await processor.process(msg)
-                attachments.append(att)
-            except UnsupportedAttachmentError as exc:
-                await update.message.reply_text(str(exc))
-                return
+        # Process every message into an Attachment, downloading concurrently
+        messages = [u.message for u in updates if u.message is not None]
+        caption: Optional[str] = next(
+            (m.caption for m in messages if m.caption is not None), None
+        )
+        try:
+            attachments = await self._attachment_processor.process_many(messages)
+        except UnsupportedAttachmentError as exc:
+            await update.message.reply_text(str(exc))
+            return
 
         if not attachments:
             await update.message.reply_text("No supported attachments found.")
@@ -1303,7 +1595,7 @@ class MessageOrchestrator:
 
         success = await self._execute_query(query, update, context)
 
-        audit_logger = context.bot_data.get("audit_logger")
+        audit_logger = self._audit_logger or context.bot_data.get("audit_logger")
         if audit_logger:
             await audit_logger.log_command(
                 user_id=user_id,
@@ -1320,38 +1612,35 @@ class MessageOrchestrator:
         /repo          — browse current directory (or workspace root)
         /repo <path>   — navigate to path (multi-level supported)
         """
-        args = update.message.text.split()[1:] if update.message.text else []
-        roots = self.settings.approved_directories
+        parts = update.message.text.split(None, 1) if update.message.text else []
+        target_name = parts[1].rstrip() if len(parts) > 1 else ""
+        roots = self._approved_roots
         storage = context.bot_data.get("storage")
 
         # Determine current browse location
         browse_root = context.user_data.get("repo_browse_root")
         browse_rel = context.user_data.get("repo_browse_rel", "")
 
-        if not browse_root or browse_root not in roots:
+        if not browse_root or browse_root not in self._approved_root_set:
             browse_root = roots[0]
             browse_rel = ""
 
-        if args:
+        if target_name:
             # /repo <path> — resolve multi-level path
-            target_name = " ".join(args)
             target_path = resolve_browse_path(target_name, roots)
 
             if not target_path:
                 await update.message.reply_text(
-                    f"Directory not found: <code>{escape_html(target_name)}</code>",
+                    _not_found_msg(target_name),
                     parse_mode="HTML",
                 )
                 return
 
             # Find which root this path is under
-            target_root = next(
-                (r for r in roots if target_path == r or target_path.is_relative_to(r)),
-                None,
-            )
+            target_root = self._approved_root(target_path)
             if not target_root:
                 await update.message.reply_text(
-                    f"Directory not found: <code>{escape_html(target_name)}</code>",
+                    _not_found_msg(target_name),
                     parse_mode="HTML",
                 )
                 return
@@ -1400,28 +1689,35 @@ class MessageOrchestrator:
         roots: list,
         context: ContextTypes.DEFAULT_TYPE,
         edit: bool = False,
+        entries: Optional[List[Tuple[Path, bool]]] = None,
     ) -> None:
-        """Render the directory browser for browse_dir."""
+        """Render the directory browser for browse_dir.
+
+        ``entries`` is ``list_browse_entries(browse_dir)`` when the caller
+        has already listed it.
+        """
         header = build_browse_header(browse_dir, workspace_root)
-        children = list_visible_children(browse_dir)
+        # One listing (with branch flags) serves both the text and the keyboard
+        if entries is None:
+            entries = list_browse_entries(browse_dir)
 
         # Build file listing text
         lines = [header, ""]
-        for child in children:
-            is_git = (child / ".git").is_dir()
-            icon = "\U0001f4e6" if is_git else "\U0001f4c1"
-            branch_marker = " \u25b6" if is_branch_dir(child) else ""
-            lines.append(
-                f"{icon} <code>{escape_html(child.name)}/</code>{branch_marker}"
-            )
+        lines.extend(
+            f"{_GIT_ICON if _is_git_checkout(child) else _DIR_ICON}"
+            f" <code>{escape_html(child.name)}/</code>"
+            f"{_BRANCH_MARKER if is_branch else ''}"
+            for child, is_branch in entries
+        )
 
-        if not children:
+        if not entries:
             lines.append("<i>No subdirectories</i>")
 
         keyboard = build_browser_keyboard(
             browse_dir=browse_dir,
             workspace_root=workspace_root,
             multi_root=len(roots) > 1,
+            entries=entries,
         )
         markup = InlineKeyboardMarkup(keyboard) if keyboard else None
         text = "\n".join(lines)
@@ -1459,11 +1755,9 @@ class MessageOrchestrator:
         ):
             await client_manager.disconnect(user_id, chat_id, message_thread_id)
 
-        is_git = (target_path / ".git").is_dir()
-        git_badge = " (git)" if is_git else ""
-
         text = (
-            f"Switched to <code>{escape_html(target_path.name)}/</code>" f"{git_badge}"
+            f"Switched to <code>{escape_html(target_path.name)}/</code>"
+            f"{_git_badge(target_path)}"
         )
 
         if edit:
@@ -1498,24 +1792,10 @@ class MessageOrchestrator:
             )
             return
 
-        # Build inline keyboard
-        def _cmd_button(cmd: dict) -> InlineKeyboardButton:
-            name = cmd["name"]
-            hint = cmd.get("argumentHint", "")
-            if hint:
-                return InlineKeyboardButton(
-                    f"{name} ...",
-                    switch_inline_query_current_chat=f"/{name} ",
-                )
-            return InlineKeyboardButton(name, callback_data=f"skill:{name}")
-
-        keyboard_rows = [[_cmd_button(cmd)] for cmd in commands]
-
-        # Truncate to fit Telegram limits
-        if len(keyboard_rows) > 100:
-            keyboard_rows = keyboard_rows[:100]
-
-        reply_markup = InlineKeyboardMarkup(keyboard_rows)
+        # Build inline keyboard, truncated to fit Telegram limits
+        reply_markup = InlineKeyboardMarkup(
+            tuple((_skill_button(cmd),) for cmd in commands[:100])
+        )
 
         # Build message text
         lines: List[str] = ["<b>Available Skills</b>\n"]
@@ -1681,7 +1961,7 @@ class MessageOrchestrator:
         current_directory = context.user_data.get("current_directory")
         if not current_directory:
             # Fall back to first approved directory
-            roots = self.settings.approved_directories
+            roots = self._approved_roots
             if roots:
                 current_directory = roots[0]
             else:
@@ -1696,8 +1976,6 @@ class MessageOrchestrator:
         filtered_entries = filter_by_directory(history_entries, current_directory)
 
         # Check history format health
-        from ..claude.history import DEFAULT_HISTORY_PATH
-
         health_warning = check_history_format_health(DEFAULT_HISTORY_PATH)
         if health_warning:
             await update.message.reply_text(
@@ -1711,7 +1989,7 @@ class MessageOrchestrator:
         )
 
         # Build inline keyboard
-        keyboard_rows: List[list] = []  # type: ignore[type-arg]
+        keyboard_rows: List[tuple] = []  # type: ignore[type-arg]
 
         if sorted_entries:
             # Cap at 10 sessions
@@ -1727,17 +2005,15 @@ class MessageOrchestrator:
                 button_label = f"{time_str} — {display_name}"
 
                 keyboard_rows.append(
-                    [
+                    (
                         InlineKeyboardButton(
                             button_label, callback_data=f"session:{entry.session_id}"
-                        )
-                    ]
+                        ),
+                    )
                 )
 
         # Always add "New Session" button at the end
-        keyboard_rows.append(
-            [InlineKeyboardButton("+ New Session", callback_data="session:new")]
-        )
+        keyboard_rows.append((_NEW_SESSION_BUTTON,))
 
         reply_markup = InlineKeyboardMarkup(keyboard_rows)
 
@@ -1764,598 +2040,511 @@ class MessageOrchestrator:
     async def _handle_callback(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
-        """Handle cd:, session:, skill:, and model: callbacks."""
-        query = update.callback_query
-        await query.answer()
-
-        data = query.data
-        prefix, value = data.split(":", 1)
+        """Dispatch an inline keyboard callback on its data prefix.
 
-        # Handle model callbacks
-        if prefix == "model":
-            await self.handle_model_callback(update, context)
-            return
-
-        # Handle remove confirmation/cancel
-        if prefix == "remove_confirm":
-            thread_id = int(value)
-            user_id = query.from_user.id
-            chat_id = query.message.chat.id if query.message else 0
-            await query.edit_message_text("Deleting topic...")
-            await self._handle_remove_confirmed(user_id, chat_id, thread_id, context)
-            return
-
-        if prefix == "remove_cancel":
-            await query.edit_message_text("Cancelled.")
+        Data without a registered prefix is treated as a cd: target. The
+        query is answered by the ``_inject_deps`` wrapper, so a repeat tap
+        of a button whose previous press is still running is dropped.
+        """
+        query = update.callback_query
+        key = (query.from_user.id, query.data)
+        if key in self._inflight_callbacks:
+            logger.debug("Dropping repeated callback", data=query.data)
             return
+        prefix, _, value = query.data.partition(":")
+        handler = self._callback_handlers.get(prefix, self._handle_cd_callback)
+        self._inflight_callbacks.add(key)
+        try:
+            await handler(update, context, value)
+        finally:
+            self._inflight_callbacks.discard(key)
 
-        # Handle skill callbacks
-        if prefix == "skill":
-            skill_name = value
-            current_dir = context.user_data.get(
-                "current_directory", self.settings.approved_directories[0]
-            )
+    async def _handle_remove_confirm_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Delete the topic after the /remove confirmation."""
+        query = update.callback_query
+        thread_id = int(value)
+        user_id = query.from_user.id
+        chat_id = query.message.chat.id if query.message else 0
+        await query.edit_message_text("Deleting topic...")
+        await self._handle_remove_confirmed(user_id, chat_id, thread_id, context)
 
-            skill_prompt = f"/{skill_name}"
-            session_id = context.user_data.get("claude_session_id")
+    async def _handle_remove_cancel_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Dismiss the /remove confirmation."""
+        query = update.callback_query
+        await query.edit_message_text("Cancelled.")
 
-            # Show running message
-            await query.edit_message_text(
-                f"⚙️ Running skill: <b>{escape_html(skill_name)}</b>...",
-                parse_mode="HTML",
-            )
+    async def _handle_skill_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Run a skill picked from the /commands keyboard."""
+        query = update.callback_query
+        skill_name = value
 
-            # Execute via Claude
-            from .attachments import Query
+        # Show running message
+        await query.edit_message_text(
+            f"⚙️ Running skill: <b>{escape_html(skill_name)}</b>...",
+            parse_mode="HTML",
+        )
 
-            user_id = query.from_user.id
-            force_new = bool(context.user_data.get("force_new_session"))
+        success = await self._execute_query(
+            Query(text=f"/{skill_name}"),
+            update,
+            context,
+            reply_to=query.message,
+        )
 
-            skill_start_time = time.time()
-            # Create a progress message for stream updates
-            progress_msg = await query.message.reply_text("Working...")
-            skill_progress_manager = ProgressMessageManager(
-                initial_message=progress_msg, start_time=skill_start_time
+        # Audit log
+        audit_logger = self._audit_logger or context.bot_data.get("audit_logger")
+        if audit_logger:
+            audit_logger.enqueue_command(
+                user_id=query.from_user.id,
+                command="skill",
+                args=[skill_name],
+                success=success,
             )
-            on_stream = build_stream_callback(skill_progress_manager)
-
-            chat = query.message.chat
-            heartbeat = self._start_typing_heartbeat(chat)
 
-            success = True
-            try:
-                claude_response = await self._run_claude_query(
-                    query=Query(text=skill_prompt),
-                    user_id=user_id,
-                    current_dir=current_dir,
-                    session_id=session_id,
-                    force_new=force_new,
-                    on_stream=on_stream,
-                    context=context,
-                )
-
-                if force_new:
-                    context.user_data["force_new_session"] = False
-
-                context.user_data["claude_session_id"] = claude_response.session_id
-
-                # Track directory changes
-                from .handlers.message import (
-                    _update_working_directory_from_claude_response,
-                )
-
-                _update_working_directory_from_claude_response(
-                    claude_response, context, self.settings, user_id
-                )
-
-                # Format response
-                from .utils.formatting import ResponseFormatter
-
-                formatter = ResponseFormatter(self.settings)
-                formatted_messages = formatter.format_claude_response(
-                    claude_response.content
-                )
+    async def _handle_nav_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Browse into a directory in the /repo browser."""
+        query = update.callback_query
+        roots = self._approved_roots
+        # Browser state is read into locals once and written back below
+        user_data = context.user_data
+        browse_root = user_data.get("repo_browse_root", roots[0])
+        if browse_root not in self._approved_root_set:
+            browse_root = roots[0]
+        browse_rel = user_data.get("repo_browse_rel", "")
+        entries: Optional[List[Tuple[Path, bool]]] = None
 
-            except Exception as e:
-                success = False
-                logger.error(
-                    "Claude skill execution failed", error=str(e), user_id=user_id
+        if value == "..":
+            # Go up one level by trimming the last part of the normalised
+            # relative path; at root — stay at root
+            browse_rel = browse_rel[: max(browse_rel.rfind(os.sep), 0)]
+        else:
+            # Navigate into directory
+            browse_dir = (browse_root / value).resolve()
+            # Validates and lists the target in one scandir
+            if self._is_within(browse_dir, browse_root):
+                entries = scan_browse_entries(browse_dir)
+            if entries is None:
+                await query.edit_message_text(
+                    _not_found_msg(value),
+                    parse_mode="HTML",
                 )
-                from .handlers.message import _format_error_message
-                from .utils.formatting import FormattedMessage
+                return
+            browse_rel = str(browse_dir.relative_to(browse_root))
 
-                formatted_messages = [
-                    FormattedMessage(_format_error_message(e), parse_mode="HTML")
-                ]
-            finally:
-                heartbeat.cancel()
+        user_data["repo_browse_root"] = browse_root
+        user_data["repo_browse_rel"] = browse_rel
+        browse_dir = browse_root / browse_rel if browse_rel else browse_root
+        await self._send_repo_browser(
+            query.message,
+            browse_dir,
+            browse_root,
+            roots,
+            context,
+            edit=True,
+            entries=entries,
+        )
 
-            await skill_progress_manager.finalize()
+    async def _handle_sel_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Select a directory from the /repo browser."""
+        query = update.callback_query
+        roots = self._approved_roots
+        user_data = context.user_data
+        browse_root = user_data.get("repo_browse_root", roots[0])
+        if browse_root not in self._approved_root_set:
+            browse_root = roots[0]
+            user_data["repo_browse_root"] = browse_root
+        browse_rel = user_data.get("repo_browse_rel", "")
+        storage = self._storage or context.bot_data.get("storage")
 
-            for i, message in enumerate(formatted_messages):
-                if not message.text or not message.text.strip():
-                    continue
-                try:
-                    await query.message.reply_text(
-                        message.text,
-                        parse_mode=message.parse_mode,
-                        reply_markup=None,
-                    )
-                    if i < len(formatted_messages) - 1:
-                        await asyncio.sleep(0.5)
-                except Exception as send_err:
-                    logger.warning(
-                        "Failed to send HTML response, retrying as plain text",
-                        error=str(send_err),
-                        message_index=i,
-                    )
-                    try:
-                        await query.message.reply_text(
-                            message.text,
-                            reply_markup=None,
-                        )
-                    except Exception as plain_err:
-                        await query.message.reply_text(
-                            f"Failed to deliver response "
-                            f"(Telegram error: {str(plain_err)[:150]}). "
-                            f"Please try again."
-                        )
+        if value == ".":
+            target_path = browse_root / browse_rel if browse_rel else browse_root
+        else:
+            target_path = (browse_root / value).resolve()
 
-            # Audit log
-            audit_logger = context.bot_data.get("audit_logger")
-            if audit_logger:
-                await audit_logger.log_command(
-                    user_id=user_id,
-                    command="skill",
-                    args=[skill_name],
-                    success=success,
-                )
+        # Validate security boundary; a prefix compare, so it goes first
+        if self._approved_root(target_path) is None:
+            await query.edit_message_text(_MSG_ACCESS_DENIED, parse_mode="HTML")
             return
 
-        # Handle nav: callbacks (browse into directory)
-        if prefix == "nav":
-            roots = self.settings.approved_directories
-            browse_root = context.user_data.get("repo_browse_root", roots[0])
-            if browse_root not in roots:
-                browse_root = roots[0]
-                context.user_data["repo_browse_root"] = browse_root
-            browse_rel = context.user_data.get("repo_browse_rel", "")
-
-            if value == "..":
-                # Go up one level
-                if browse_rel:
-                    parent_rel = str(Path(browse_rel).parent)
-                    new_rel = "" if parent_rel == "." else parent_rel
-                else:
-                    # At root — stay at root
-                    new_rel = ""
-
-                context.user_data["repo_browse_rel"] = new_rel
-            else:
-                # Navigate into directory
-                browse_dir = (browse_root / value).resolve()
-                if not browse_dir.is_dir() or not browse_dir.is_relative_to(
-                    browse_root
-                ):
-                    await query.edit_message_text(
-                        f"Directory not found: <code>{escape_html(value)}</code>",
-                        parse_mode="HTML",
-                    )
-                    return
-                context.user_data["repo_browse_rel"] = str(
-                    browse_dir.relative_to(browse_root)
-                )
-                context.user_data["repo_browse_root"] = browse_root
-
-            browse_rel = context.user_data["repo_browse_rel"]
-            browse_dir = browse_root / browse_rel if browse_rel else browse_root
-            await self._send_repo_browser(
-                query.message, browse_dir, browse_root, roots, context, edit=True
+        if not target_path.is_dir():
+            await query.edit_message_text(
+                _not_found_msg(value),
+                parse_mode="HTML",
             )
             return
 
-        # Handle sel: callbacks (select directory)
-        if prefix == "sel":
-            roots = self.settings.approved_directories
-            browse_root = context.user_data.get("repo_browse_root", roots[0])
-            if browse_root not in roots:
-                browse_root = roots[0]
-                context.user_data["repo_browse_root"] = browse_root
-            browse_rel = context.user_data.get("repo_browse_rel", "")
-            storage = context.bot_data.get("storage")
-
-            if value == ".":
-                target_path = browse_root / browse_rel if browse_rel else browse_root
-            else:
-                target_path = (browse_root / value).resolve()
+        _sel_chat_id, _sel_thread_id = self._resolve_chat_key(update, context)
+        await self._select_directory(
+            query.message,
+            target_path,
+            storage,
+            context,
+            edit=True,
+            user_id=query.from_user.id,
+            chat_id=_sel_chat_id,
+            message_thread_id=_sel_thread_id,
+        )
 
-            if not target_path.is_dir():
+        # Audit log
+        audit_logger = self._audit_logger or context.bot_data.get("audit_logger")
+        if audit_logger:
+            audit_logger.enqueue_command(
+                user_id=query.from_user.id,
+                command="repo",
+                args=[str(target_path)],
+                success=True,
+            )
+
+    async def _handle_start_nav_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Navigate in the /start wizard browser."""
+        query = update.callback_query
+        roots = self._approved_roots
+        user_data = context.user_data
+        add_browse_root = user_data.get("add_browse_root", roots[0])
+        if add_browse_root not in self._approved_root_set:
+            add_browse_root = roots[0]
+        add_browse_rel = user_data.get("add_browse_rel", "")
+        entries = None
+
+        if value == "..":
+            add_browse_rel = add_browse_rel[: max(add_browse_rel.rfind(os.sep), 0)]
+        else:
+            browse_dir = (add_browse_root / value).resolve()
+            if self._is_within(browse_dir, add_browse_root):
+                entries = scan_browse_entries(browse_dir)
+            if entries is None:
                 await query.edit_message_text(
-                    f"Directory not found: <code>{escape_html(value)}</code>",
+                    _not_found_msg(value),
                     parse_mode="HTML",
                 )
                 return
+            add_browse_rel = str(browse_dir.relative_to(add_browse_root))
 
-            # Validate security boundary
-            if not any(
-                target_path == r or target_path.is_relative_to(r) for r in roots
-            ):
-                await query.edit_message_text("Access denied.", parse_mode="HTML")
-                return
-
-            _sel_chat_id, _sel_thread_id = self._resolve_chat_key(update, context)
-            await self._select_directory(
-                query.message,
-                target_path,
-                storage,
-                context,
-                edit=True,
-                user_id=query.from_user.id,
-                chat_id=_sel_chat_id,
-                message_thread_id=_sel_thread_id,
-            )
-
-            # Audit log
-            audit_logger = context.bot_data.get("audit_logger")
-            if audit_logger:
-                await audit_logger.log_command(
-                    user_id=query.from_user.id,
-                    command="repo",
-                    args=[str(target_path)],
-                    success=True,
-                )
-            return
+        user_data["add_browse_root"] = add_browse_root
+        user_data["add_browse_rel"] = add_browse_rel
+        browse_dir = (
+            add_browse_root / add_browse_rel if add_browse_rel else add_browse_root
+        )
 
-        # Handle start_nav: callbacks (navigate in /start wizard browser)
-        if prefix == "start_nav":
-            roots = self.settings.approved_directories
-            add_browse_root = context.user_data.get("add_browse_root", roots[0])
-            if add_browse_root not in roots:
-                add_browse_root = roots[0]
-                context.user_data["add_browse_root"] = add_browse_root
-            add_browse_rel = context.user_data.get("add_browse_rel", "")
-
-            if value == "..":
-                if add_browse_rel:
-                    parent_rel = str(Path(add_browse_rel).parent)
-                    new_rel = "" if parent_rel == "." else parent_rel
-                else:
-                    new_rel = ""
-                context.user_data["add_browse_rel"] = new_rel
-            else:
-                browse_dir = (add_browse_root / value).resolve()
-                if not browse_dir.is_dir() or not browse_dir.is_relative_to(
-                    add_browse_root
-                ):
-                    await query.edit_message_text(
-                        f"Directory not found: <code>{escape_html(value)}</code>",
-                        parse_mode="HTML",
+        # Rebuild keyboard with start_ prefixes
+        keyboard_rows = build_browser_keyboard(
+            browse_dir,
+            add_browse_root,
+            multi_root=len(roots) > 1,
+            entries=entries,
+        )
+        remapped_rows = []
+        for row in keyboard_rows:
+            new_row = []
+            for btn in row:
+                data = btn.callback_data or ""
+                if data.startswith("sel:"):
+                    new_row.append(
+                        InlineKeyboardButton(
+                            btn.text, callback_data=f"start_sel:{data[4:]}"
+                        )
                     )
-                    return
-                context.user_data["add_browse_rel"] = str(
-                    browse_dir.relative_to(add_browse_root)
-                )
-                context.user_data["add_browse_root"] = add_browse_root
+                elif data.startswith("nav:"):
+                    new_row.append(
+                        InlineKeyboardButton(
+                            btn.text, callback_data=f"start_nav:{data[4:]}"
+                        )
+                    )
+                else:
+                    new_row.append(btn)
+            remapped_rows.append(new_row)
+
+        await query.edit_message_text(
+            build_browse_header(browse_dir, add_browse_root),
+            parse_mode="HTML",
+            reply_markup=InlineKeyboardMarkup(remapped_rows),
+        )
 
-            add_browse_rel = context.user_data["add_browse_rel"]
-            browse_dir = (
+    async def _handle_start_sel_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Select a directory in the /start wizard."""
+        query = update.callback_query
+        roots = self._approved_roots
+        add_browse_root = context.user_data.get("add_browse_root", roots[0])
+        if add_browse_root not in self._approved_root_set:
+            add_browse_root = roots[0]
+        add_browse_rel = context.user_data.get("add_browse_rel", "")
+
+        if value == ".":
+            target_path = (
                 add_browse_root / add_browse_rel if add_browse_rel else add_browse_root
             )
+        else:
+            target_path = (add_browse_root / value).resolve()
 
-            # Rebuild keyboard with start_ prefixes
-            keyboard_rows = build_browser_keyboard(
-                browse_dir, add_browse_root, multi_root=len(roots) > 1
-            )
-            remapped_rows = []
-            for row in keyboard_rows:
-                new_row = []
-                for btn in row:
-                    data = btn.callback_data or ""
-                    if data.startswith("sel:"):
-                        new_row.append(
-                            InlineKeyboardButton(
-                                btn.text, callback_data=f"start_sel:{data[4:]}"
-                            )
-                        )
-                    elif data.startswith("nav:"):
-                        new_row.append(
-                            InlineKeyboardButton(
-                                btn.text, callback_data=f"start_nav:{data[4:]}"
-                            )
-                        )
-                    else:
-                        new_row.append(btn)
-                remapped_rows.append(new_row)
+        if self._approved_root(target_path) is None:
+            await query.edit_message_text(_MSG_ACCESS_DENIED, parse_mode="HTML")
+            return
 
+        if not target_path.is_dir():
             await query.edit_message_text(
-                build_browse_header(browse_dir, add_browse_root),
+                _not_found_msg(value),
                 parse_mode="HTML",
-                reply_markup=InlineKeyboardMarkup(remapped_rows),
             )
             return
 
-        # Handle start_sel: callbacks (select directory in /start wizard)
-        if prefix == "start_sel":
-            roots = self.settings.approved_directories
-            add_browse_root = context.user_data.get("add_browse_root", roots[0])
-            if add_browse_root not in roots:
-                add_browse_root = roots[0]
-            add_browse_rel = context.user_data.get("add_browse_rel", "")
-
-            if value == ".":
-                target_path = (
-                    add_browse_root / add_browse_rel
-                    if add_browse_rel
-                    else add_browse_root
-                )
-            else:
-                target_path = (add_browse_root / value).resolve()
+        await self._start_wizard_session_picker(
+            query.message, target_path, context, edit=True
+        )
 
-            if not target_path.is_dir():
-                await query.edit_message_text(
-                    f"Directory not found: <code>{escape_html(value)}</code>",
-                    parse_mode="HTML",
-                )
-                return
+    async def _handle_start_ses_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Wizard step 3: create the project topic and connect."""
+        query = update.callback_query
+        wizard_dir = context.user_data.get("start_wizard_dir")
+        if not wizard_dir:
+            await query.edit_message_text("Session expired. Use /start again.")
+            return
 
-            if not any(
-                target_path == r or target_path.is_relative_to(r) for r in roots
-            ):
-                await query.edit_message_text("Access denied.", parse_mode="HTML")
-                return
+        chat_id = query.message.chat.id if query.message else 0
+        user_id = query.from_user.id
+        directory = wizard_dir
+        dir_name = Path(directory).name
+        session_id: Optional[str] = value if value != "new" else None
 
-            await self._start_wizard_session_picker(
-                query.message, target_path, context, edit=True
-            )
+        manager = context.bot_data.get("project_threads_manager")
+        if not manager:
+            await query.edit_message_text("Project threads not configured.")
             return
 
-        # Handle start_ses: callbacks (wizard step 3 — create topic + connect)
-        if prefix == "start_ses":
-            wizard_dir = context.user_data.get("start_wizard_dir")
-            if not wizard_dir:
-                await query.edit_message_text("Session expired. Use /start again.")
+        # Check if a topic already exists for this session
+        if session_id and manager.repository:
+            existing = await manager.repository.find_by_session_id(chat_id, session_id)
+            if existing:
+                topic_link = (
+                    f"https://t.me/c/{str(chat_id).removeprefix('-100')}"
+                    f"/{existing.message_thread_id}"
+                )
+                topic_label = existing.topic_name or dir_name
+                await query.edit_message_text(
+                    f"Session already has a topic: "
+                    f'<a href="{topic_link}">{escape_html(topic_label)}</a>',
+                    parse_mode="HTML",
+                )
+                # Cleanup wizard state
+                context.user_data.pop("start_wizard_dir", None)
+                context.user_data.pop("start_browse_root", None)
+                context.user_data.pop("start_browse_rel", None)
                 return
 
-            chat_id = query.message.chat.id if query.message else 0
-            user_id = query.from_user.id
-            directory = wizard_dir
-            dir_name = Path(directory).name
-            session_id: Optional[str] = value if value != "new" else None
-
-            manager = context.bot_data.get("project_threads_manager")
-            if not manager:
-                await query.edit_message_text("Project threads not configured.")
-                return
+        # Generate topic name
+        if session_id:
+            topic_name = f"{dir_name} — {session_id[:8]}"
+        else:
+            topic_name = dir_name
 
-            # Check if a topic already exists for this session
-            if session_id and manager.repository:
-                existing = await manager.repository.find_by_session_id(
-                    chat_id, session_id
-                )
-                if existing:
-                    topic_link = (
-                        f"https://t.me/c/{str(chat_id).removeprefix('-100')}"
-                        f"/{existing.message_thread_id}"
-                    )
-                    topic_label = existing.topic_name or dir_name
-                    await query.edit_message_text(
-                        f"Session already has a topic: "
-                        f'<a href="{topic_link}">{escape_html(topic_label)}</a>',
-                        parse_mode="HTML",
-                    )
-                    # Cleanup wizard state
-                    context.user_data.pop("start_wizard_dir", None)
-                    context.user_data.pop("start_browse_root", None)
-                    context.user_data.pop("start_browse_rel", None)
-                    return
+        # Avoid collision with existing topic names
+        existing = await manager.list_topics(chat_id)
+        existing_names = [t.topic_name for t in existing]
+        final_name = manager.generate_topic_name(
+            directory, existing_names, override_name=topic_name
+        )
 
-            # Generate topic name
-            if session_id:
-                topic_name = f"{dir_name} — {session_id[:8]}"
-            else:
-                topic_name = dir_name
+        await query.edit_message_text(
+            f"Creating topic <b>{escape_html(final_name)}</b>...",
+            parse_mode="HTML",
+        )
 
-            # Avoid collision with existing topic names
-            existing = await manager.list_topics(chat_id)
-            existing_names = [t.topic_name for t in existing]
-            final_name = manager.generate_topic_name(
-                directory, existing_names, override_name=topic_name
+        try:
+            mapping = await manager.create_topic(
+                context.bot,
+                chat_id,
+                user_id,
+                directory,
+                final_name,
+                session_id=session_id,
             )
+            thread_id = mapping.message_thread_id
 
-            await query.edit_message_text(
-                f"Creating topic <b>{escape_html(final_name)}</b>...",
-                parse_mode="HTML",
+            # Eagerly connect
+            client_manager: Optional[ClientManager] = (
+                self._client_manager or context.bot_data.get("client_manager")
             )
-
-            try:
-                mapping = await manager.create_topic(
-                    context.bot,
-                    chat_id,
-                    user_id,
-                    directory,
-                    final_name,
+            if client_manager:
+                client = await client_manager.get_or_connect(
+                    user_id=user_id,
+                    chat_id=chat_id,
+                    message_thread_id=thread_id,
+                    directory=directory,
                     session_id=session_id,
+                    force_new=(session_id is None),
+                    approved_directory=str(self._default_directory),
                 )
-                thread_id = mapping.message_thread_id
-
-                # Eagerly connect
-                client_manager: Optional[ClientManager] = context.bot_data.get(
-                    "client_manager"
-                )
-                if client_manager:
-                    client = await client_manager.get_or_connect(
-                        user_id=user_id,
+                # For new sessions, rename topic with session snippet
+                if session_id is None and client.session_id:
+                    new_name = f"{dir_name} — {client.session_id[:8]}"
+                    lifecycle_wiz: Optional[TopicLifecycleManager] = (
+                        context.bot_data.get("lifecycle_manager")
+                    )
+                    if lifecycle_wiz:
+                        await lifecycle_wiz.rename_topic(
+                            context.bot, chat_id, thread_id, new_name
+                        )
+                    await manager.repository.upsert(
                         chat_id=chat_id,
                         message_thread_id=thread_id,
+                        user_id=user_id,
                         directory=directory,
-                        session_id=session_id,
-                        force_new=(session_id is None),
-                        approved_directory=str(self.settings.approved_directories[0]),
+                        topic_name=new_name,
+                        session_id=client.session_id,
                     )
-                    # For new sessions, rename topic with session snippet
-                    if session_id is None and client.session_id:
-                        new_name = f"{dir_name} — {client.session_id[:8]}"
-                        lifecycle_wiz: Optional[TopicLifecycleManager] = (
-                            context.bot_data.get("lifecycle_manager")
-                        )
-                        if lifecycle_wiz:
-                            await lifecycle_wiz.rename_topic(
-                                context.bot, chat_id, thread_id, new_name
-                            )
-                        await manager.repository.upsert(
-                            chat_id=chat_id,
-                            message_thread_id=thread_id,
-                            user_id=user_id,
-                            directory=directory,
-                            topic_name=new_name,
-                            session_id=client.session_id,
-                        )
 
-                await query.edit_message_text(
-                    f"Topic <b>{escape_html(final_name)}</b> created "
-                    f"→ <code>{escape_html(directory)}</code>",
-                    parse_mode="HTML",
-                )
+            await query.edit_message_text(
+                f"Topic <b>{escape_html(final_name)}</b> created "
+                f"→ <code>{escape_html(directory)}</code>",
+                parse_mode="HTML",
+            )
 
-                # Send brief transcript preview for existing sessions
-                if session_id:
-                    try:
-                        from src.claude.transcript import (
-                            format_condensed,
-                            read_full_transcript,
-                        )
+            # Send brief transcript preview for existing sessions
+            if session_id:
+                try:
+                    from src.claude.transcript import (
+                        format_condensed,
+                        read_full_transcript,
+                    )
 
-                        entries = read_full_transcript(session_id, directory)
-                        if entries:
-                            # Single message with as much recent history as fits
-                            history_messages = format_condensed(entries, last_n=20)
-                            if history_messages:
-                                await context.bot.send_message(
-                                    chat_id=chat_id,
-                                    text=history_messages[-1],
-                                    message_thread_id=thread_id,
-                                )
-                            # Mark as replayed so _execute_query skips it
-                            context.chat_data[f"_history_replayed_{thread_id}"] = True
-                    except Exception as e:
-                        logger.warning(
-                            "wizard_transcript_send_failed",
-                            error=str(e),
-                            session_id=session_id,
-                            thread_id=thread_id,
-                        )
+                    entries = read_full_transcript(session_id, directory)
+                    if entries:
+                        # Single message with as much recent history as fits
+                        history_messages = format_condensed(entries, last_n=20)
+                        if history_messages:
+                            await context.bot.send_message(
+                                chat_id=chat_id,
+                                text=history_messages[-1],
+                                message_thread_id=thread_id,
+                            )
+                        # Mark as replayed so _execute_query skips it
+                        context.chat_data[f"_history_replayed_{thread_id}"] = True
+                except Exception as e:
+                    logger.warning(
+                        "wizard_transcript_send_failed",
+                        error=str(e),
+                        session_id=session_id,
+                        thread_id=thread_id,
+                    )
 
-            except Exception as e:
-                logger.error("start_wizard_create_failed", error=str(e))
-                await query.message.reply_text(
-                    f"Failed to create topic: {str(e)[:200]}"
-                )
+        except Exception as e:
+            logger.error("start_wizard_create_failed", error=str(e))
+            await query.message.reply_text(f"Failed to create topic: {str(e)[:200]}")
 
-            # Cleanup wizard state
-            context.user_data.pop("start_wizard_dir", None)
-            context.user_data.pop("start_browse_root", None)
-            context.user_data.pop("start_browse_rel", None)
-            return
+        # Cleanup wizard state
+        context.user_data.pop("start_wizard_dir", None)
+        context.user_data.pop("start_browse_root", None)
+        context.user_data.pop("start_browse_rel", None)
 
-        # Handle session callbacks
-        if prefix == "session":
-            _ses_chat_id, _ses_thread_id = self._resolve_chat_key(update, context)
-            if value == "new":
-                context.user_data["force_new_session"] = True
-                # Eager connect like /new
-                client_manager = context.bot_data.get("client_manager")
-                current_dir = context.user_data.get(
-                    "current_directory",
-                    self.settings.approved_directories[0],
-                )
-                if client_manager:
-                    try:
-                        client = await client_manager.get_or_connect(
-                            user_id=query.from_user.id,
-                            chat_id=_ses_chat_id,
-                            message_thread_id=_ses_thread_id,
-                            directory=str(current_dir),
-                            session_id=None,
-                            force_new=True,
-                            approved_directory=str(
-                                self.settings.approved_directories[0]
-                            ),
-                        )
-                        context.user_data["claude_session_id"] = client.session_id
-                        context.user_data["force_new_session"] = False
-                    except Exception:
-                        pass  # Will lazy-connect on next message
-                await query.edit_message_text(
-                    "New session started. Ready.",
-                    parse_mode="HTML",
-                )
-            else:
-                # Resume session by ID — eagerly connect
-                context.user_data["claude_session_id"] = value
-                current_dir = context.user_data.get(
-                    "current_directory",
-                    self.settings.approved_directories[0],
+    async def _handle_session_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Start or resume a session picked from /resume."""
+        query = update.callback_query
+        _ses_chat_id, _ses_thread_id = self._resolve_chat_key(update, context)
+        if value == "new":
+            context.user_data["force_new_session"] = True
+            # Connect like /new, but without holding up the reply
+            client_manager = self._client_manager or context.bot_data.get(
+                "client_manager"
+            )
+            current_dir = context.user_data.get(
+                "current_directory",
+                self._default_directory,
+            )
+            key = (query.from_user.id, _ses_chat_id, _ses_thread_id)
+            pending = self._pending_connects.get(key)
+            # A repeat tap reuses the connect already in flight
+            if client_manager and (pending is None or pending.done()):
+                task = asyncio.create_task(
+                    self._connect_new_session(
+                        client_manager, key, str(current_dir), context
+                    )
                 )
-                client_manager = context.bot_data.get("client_manager")
-                if client_manager:
-                    try:
-                        await client_manager.switch_session(
-                            user_id=query.from_user.id,
-                            chat_id=_ses_chat_id,
-                            message_thread_id=_ses_thread_id,
-                            session_id=value,
-                            directory=str(current_dir),
-                            approved_directory=str(
-                                self.settings.approved_directories[0]
-                            ),
-                        )
-                    except Exception:
-                        logger.debug(
-                            "session_callback_eager_connect_failed", session_id=value
-                        )
-
-                # Show transcript preview (last 3 messages)
-                recent_lines: List[str] = [
-                    "\U0001f4c2 <b>Session resumed. Ready.</b>\n"
-                ]
+                self._pending_connects[key] = task
+                task.add_done_callback(lambda t: self._forget_pending_connect(key, t))
+            await query.edit_message_text(
+                _MSG_NEW_SESSION,
+                parse_mode="HTML",
+            )
+        else:
+            # Resume session by ID — eagerly connect
+            context.user_data["claude_session_id"] = value
+            current_dir = context.user_data.get(
+                "current_directory",
+                self._default_directory,
+            )
+            client_manager = self._client_manager or context.bot_data.get(
+                "client_manager"
+            )
+            if client_manager:
                 try:
-                    transcript = read_session_transcript(
+                    await client_manager.switch_session(
+                        user_id=query.from_user.id,
+                        chat_id=_ses_chat_id,
+                        message_thread_id=_ses_thread_id,
                         session_id=value,
-                        project_dir=str(current_dir),
-                        limit=3,
+                        directory=str(current_dir),
+                        approved_directory=str(self._default_directory),
                     )
-                    if transcript:
-                        recent_lines.append("<b>Recent:</b>")
-                        for msg in transcript:
-                            preview = msg.text[:120]
-                            if len(msg.text) > 120:
-                                preview += "\u2026"
-                            label = "You" if msg.role == "user" else "Claude"
-                            recent_lines.append(
-                                f"  <b>{label}:</b> {escape_html(preview)}"
-                            )
                 except Exception:
-                    pass
+                    logger.debug(
+                        "session_callback_eager_connect_failed", session_id=value
+                    )
 
-                await query.edit_message_text(
-                    "\n".join(recent_lines),
-                    parse_mode="HTML",
-                )
+            # Show transcript preview (last 3 messages); a missing or
+            # unreadable transcript comes back empty rather than raising
+            recent_lines: List[str] = [_SESSION_RESUMED_HEADER]
+            transcript = read_session_transcript(
+                session_id=value,
+                project_dir=str(current_dir),
+                limit=3,
+            )
+            if transcript:
+                recent_lines.append(_RECENT_LABEL)
+                for msg in transcript:
+                    preview = msg.text[:120]
+                    if len(msg.text) > 120:
+                        preview += "\u2026"
+                    label = "You" if msg.role == "user" else "Claude"
+                    recent_lines.append(f"  <b>{label}:</b> {escape_html(preview)}")
 
-            # Audit log
-            audit_logger = context.bot_data.get("audit_logger")
-            if audit_logger:
-                await audit_logger.log_command(
-                    user_id=query.from_user.id,
-                    command="session",
-                    args=[value],
-                    success=True,
-                )
-            return
+            await query.edit_message_text(
+                "\n".join(recent_lines),
+                parse_mode="HTML",
+            )
 
-        # Handle cd callbacks (existing logic)
-        roots = self.settings.approved_directories
-        storage = context.bot_data.get("storage")
+        # Audit log
+        audit_logger = self._audit_logger or context.bot_data.get("audit_logger")
+        if audit_logger:
+            audit_logger.enqueue_command(
+                user_id=query.from_user.id,
+                command="session",
+                args=[value],
+                success=True,
+            )
+
+    async def _handle_cd_callback(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE, value: str
+    ) -> None:
+        """Switch to a directory by name or absolute path."""
+        query = update.callback_query
+        roots = self._approved_roots
         path_str = value
 
         # Parse the path - could be relative name or absolute path
@@ -2363,9 +2552,7 @@ class MessageOrchestrator:
         if Path(path_str).is_absolute():
             # Absolute path from callback
             candidate = Path(path_str)
-            if candidate.is_dir() and any(
-                candidate == r or candidate.is_relative_to(r) for r in roots
-            ):
+            if candidate.is_dir() and self._approved_root(candidate) is not None:
                 new_path = candidate
         else:
             # Relative name - search across all roots
@@ -2377,7 +2564,7 @@ class MessageOrchestrator:
 
         if not new_path:
             await query.edit_message_text(
-                f"Directory not found: <code>{escape_html(path_str)}</code>",
+                _not_found_msg(path_str),
                 parse_mode="HTML",
             )
             return
@@ -2388,28 +2575,31 @@ class MessageOrchestrator:
         context.user_data["claude_session_id"] = None
         context.user_data["force_new_session"] = False
 
-        # Disconnect active SDK session for the current chat key
+        # Disconnect active SDK session for the current chat key; the reply
+        # does not depend on it, so both go out together
         _cd_chat_id, _cd_thread_id = self._resolve_chat_key(update, context)
-        client_manager_cd: Optional[ClientManager] = context.bot_data.get(
-            "client_manager"
+        client_manager_cd: Optional[ClientManager] = (
+            self._client_manager or context.bot_data.get("client_manager")
         )
+        pending: List[Awaitable[Any]] = [
+            query.edit_message_text(
+                f"Switched to <code>{escape_html(new_path.name)}/</code>"
+                f"{_git_badge(new_path)}",
+                parse_mode="HTML",
+            )
+        ]
         if client_manager_cd:
-            await client_manager_cd.disconnect(
-                query.from_user.id, _cd_chat_id, _cd_thread_id
+            pending.append(
+                client_manager_cd.disconnect(
+                    query.from_user.id, _cd_chat_id, _cd_thread_id
+                )
             )
-
-        is_git = (new_path / ".git").is_dir()
-        git_badge = " (git)" if is_git else ""
-
-        await query.edit_message_text(
-            f"Switched to <code>{escape_html(new_path.name)}/</code>" f"{git_badge}",
-            parse_mode="HTML",
-        )
+        await asyncio.gather(*pending)
 
         # Audit log
-        audit_logger = context.bot_data.get("audit_logger")
+        audit_logger = self._audit_logger or context.bot_data.get("audit_logger")
         if audit_logger:
-            await audit_logger.log_command(
+            audit_logger.enqueue_command(
                 user_id=query.from_user.id,
                 command="cd",
                 args=[str(new_path)],
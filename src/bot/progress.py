@@ -6,10 +6,15 @@ import asyncio
 import re
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional
 
 from telegram import Message
 
+try:  # linear-time matching for the secret scan when google-re2 is installed
+    import re2 as _secret_re
+except ImportError:  # pragma: no cover - exercised only without google-re2
+    _secret_re = re  # type: ignore[no-redef]
+
 # ---------------------------------------------------------------------------
 # Task 1: ActivityEntry data model
 # ---------------------------------------------------------------------------
@@ -33,45 +38,82 @@ class ActivityEntry:
 # Task 2: Secret patterns, redaction, tool icons, input summarizer
 # ---------------------------------------------------------------------------
 
-_SECRET_PATTERNS: List[re.Pattern[str]] = [
-    # API keys / tokens (sk-ant-..., sk-..., ghp_..., gho_..., github_pat_..., xoxb-...)
-    re.compile(
-        r"(sk-ant-api\d*-[A-Za-z0-9_-]{10})[A-Za-z0-9_-]*"
-        r"|(sk-[A-Za-z0-9_-]{20})[A-Za-z0-9_-]*"
-        r"|(ghp_[A-Za-z0-9]{5})[A-Za-z0-9]*"
-        r"|(gho_[A-Za-z0-9]{5})[A-Za-z0-9]*"
-        r"|(github_pat_[A-Za-z0-9_]{5})[A-Za-z0-9_]*"
-        r"|(xoxb-[A-Za-z0-9]{5})[A-Za-z0-9-]*"
-    ),
-    # AWS access keys
-    re.compile(r"(AKIA[0-9A-Z]{4})[0-9A-Z]{12}"),
-    # Generic long hex/base64 tokens after common flags/env patterns
-    re.compile(
-        r"((?:--token|--secret|--password|--api-key|--apikey|--auth)"
-        r"[= ]+)['\"]?[A-Za-z0-9+/_.:-]{8,}['\"]?"
-    ),
-    # Inline env assignments like KEY=value
-    re.compile(
-        r"((?:TOKEN|SECRET|PASSWORD|API_KEY|APIKEY|AUTH_TOKEN|PRIVATE_KEY"
-        r"|ACCESS_KEY|CLIENT_SECRET|WEBHOOK_SECRET)"
-        r"=)['\"]?[^\s'\"]{8,}['\"]?"
-    ),
-    # Bearer / Basic auth headers
-    re.compile(r"(Bearer )[A-Za-z0-9+/_.:-]{8,}" r"|(Basic )[A-Za-z0-9+/=]{8,}"),
-    # Connection strings with credentials  user:pass@host
-    re.compile(r"://([^:]+:)[^@]{4,}(@)"),
-]
+# One alternation scanned in a single pass; each rule captures the prefix
+# kept in front of "***" (rules without a group are replaced entirely).
+# Only RE2-compatible syntax: no backreferences or lookaround.
+_SECRET_PATTERN = _secret_re.compile(
+    "|".join(
+        (
+            # API keys / tokens (sk-ant-, sk-, ghp_, gho_, github_pat_, xoxb-)
+            r"(sk-ant-api\d*-[A-Za-z0-9_-]{10})[A-Za-z0-9_-]*"
+            r"|(sk-[A-Za-z0-9_-]{20})[A-Za-z0-9_-]*"
+            r"|(ghp_[A-Za-z0-9]{5})[A-Za-z0-9]*"
+            r"|(gho_[A-Za-z0-9]{5})[A-Za-z0-9]*"
+            r"|(github_pat_[A-Za-z0-9_]{5})[A-Za-z0-9_]*"
+            r"|(xoxb-[A-Za-z0-9]{5})[A-Za-z0-9-]*",
+            # AWS access keys
+            r"(AKIA[0-9A-Z]{4})[0-9A-Z]{12}",
+            # Generic long hex/base64 tokens after common flags/env patterns
+            r"((?:--token|--secret|--password|--api-key|--apikey|--auth)"
+            r"[= ]+)['\"]?[A-Za-z0-9+/_.:-]{8,}['\"]?",
+            # Inline env assignments like KEY=value
+            r"((?:TOKEN|SECRET|PASSWORD|API_KEY|APIKEY|AUTH_TOKEN|PRIVATE_KEY"
+            r"|ACCESS_KEY|CLIENT_SECRET|WEBHOOK_SECRET)"
+            r"=)['\"]?[^\s'\"]{8,}['\"]?",
+            # Bearer / Basic auth headers
+            r"(Bearer )[A-Za-z0-9+/_.:-]{8,}" r"|(Basic )[A-Za-z0-9+/=]{8,}",
+            # Connection strings with credentials  user:pass@host
+            r"://([^:]+:)[^@]{4,}(@)",
+        )
+    )
+)
+
+
+# Literals at least one of which occurs in every match above; text without
+# any of them skips the full scan. Keep in sync when adding a rule.
+_SECRET_TRIGGERS = re.compile(
+    "|".join(
+        map(
+            re.escape,
+            (
+                "sk-",
+                "ghp_",
+                "gho_",
+                "github_pat_",
+                "xoxb-",
+                "AKIA",
+                "--token",
+                "--secret",
+                "--password",
+                "--api-key",
+                "--apikey",
+                "--auth",
+                "TOKEN=",
+                "SECRET=",
+                "PASSWORD=",
+                "API_KEY=",
+                "APIKEY=",
+                "PRIVATE_KEY=",
+                "ACCESS_KEY=",
+                "Bearer ",
+                "Basic ",
+                "://",
+            ),
+        )
+    )
+)
+
+
+def _redact_match(match: re.Match[str]) -> str:
+    """Keep the matched rule's captured prefix and mask the rest."""
+    return next((g + "***" for g in match.groups() if g is not None), "***")
 
 
 def redact_secrets(text: str) -> str:
     """Replace likely secrets/credentials with redacted placeholders."""
-    result = text
-    for pattern in _SECRET_PATTERNS:
-        result = pattern.sub(
-            lambda m: next((g + "***" for g in m.groups() if g is not None), "***"),
-            result,
-        )
-    return result
+    if _SECRET_TRIGGERS.search(text) is None:
+        return text
+    return _SECRET_PATTERN.sub(_redact_match, text)
 
 
 # Tool name -> friendly emoji mapping for verbose output
@@ -192,7 +234,7 @@ class ProgressMessageManager:
         When *done* is True the header changes to "Done (Xs)" and all
         running spinners are suppressed.
         """
-        elapsed = int(time.time() - self._start_time)
+        elapsed = int(time.monotonic() - self._start_time)
         if done:
             header = f"Done ({elapsed}s)"
         else:
@@ -220,14 +262,18 @@ class ProgressMessageManager:
                     lines.append(f"  \u21b3 {entry.tool_result}")
             elif entry.kind == "thinking":
                 if done or not entry.is_running:
-                    end = entry.ended_at or time.time()
+                    end = entry.ended_at or time.monotonic()
                     dur = int(end - entry.started_at) if entry.started_at else 0
                     if dur:
                         lines.append(f"\U0001f4ad Thinking ({dur}s)")
                     else:
                         lines.append("\U0001f4ad Thinking (done)")
                 else:
-                    dur = int(time.time() - entry.started_at) if entry.started_at else 0
+                    dur = (
+                        int(time.monotonic() - entry.started_at)
+                        if entry.started_at
+                        else 0
+                    )
                     self._dot_count = (self._dot_count % 3) + 1
                     dots = "." * self._dot_count
                     if dur >= 3:
@@ -247,7 +293,7 @@ class ProgressMessageManager:
         The edit runs as a background task so the stream processing loop
         is never blocked by Telegram rate-limiting or network latency.
         """
-        now = time.time()
+        now = time.monotonic()
         if now - self._last_update < self.EDIT_INTERVAL:
             return
         self._last_update = now  # claim slot immediately to prevent re-entry
@@ -284,7 +330,7 @@ class ProgressMessageManager:
         self._message = new_message
         self.messages.append(new_message)
         self.activity_log = []
-        self._last_update = time.time()
+        self._last_update = time.monotonic()
 
     # ------------------------------------------------------------------
     # Finalize
@@ -320,7 +366,7 @@ def _close_running_entry(activity_log: List[ActivityEntry]) -> None:
     for entry in reversed(activity_log):
         if entry.is_running:
             entry.is_running = False
-            entry.ended_at = time.time()
+            entry.ended_at = time.monotonic()
             return
 
 
@@ -371,10 +417,17 @@ def _extract_tool_result_text(content: Any) -> str:
 
 def build_stream_callback(
     progress_manager: ProgressMessageManager,
+    on_event: Optional[Callable[[], None]] = None,
 ) -> Any:
-    """Return an async callback that feeds stream events into progress_manager."""
+    """Return an async callback that feeds stream events into progress_manager.
+
+    ``on_event`` is called synchronously for every event before the
+    progress message is updated.
+    """
 
     async def _callback(event_type: str, content: Any) -> None:
+        if on_event is not None:
+            on_event()
         log = progress_manager.activity_log
 
         if event_type not in ("tool_result", "thinking"):
@@ -409,7 +462,7 @@ def build_stream_callback(
                         kind="thinking",
                         content="Thinking",
                         is_running=True,
-                        started_at=time.time(),
+                        started_at=time.monotonic(),
                     )
                 )
 
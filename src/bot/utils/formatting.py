@@ -38,6 +38,10 @@ class ResponseFormatter:
         self, text: str, context: Optional[dict] = None
     ) -> List[FormattedMessage]:
         """Enhanced formatting with context awareness and semantic chunking."""
+        # Tool-only turns have no text; skip the conversion passes
+        if not text or text.isspace():
+            return [FormattedMessage("<i>(No content to display)</i>")]
+
         # Clean and prepare text
         text = self._clean_text(text)
 
@@ -54,6 +58,9 @@ class ResponseFormatter:
             text = self._format_code_blocks(text)
             messages = self._split_message(text)
 
+        # Each message is a separate (rate-limited) send, so pack small ones
+        messages = self._coalesce_messages(messages)
+
         # Add context-aware quick actions to the last message
         if messages and self.settings.enable_quick_actions:
             messages[-1].reply_markup = self._get_contextual_keyboard(context)
@@ -67,6 +74,29 @@ class ResponseFormatter:
             else [FormattedMessage("<i>(No content to display)</i>")]
         )
 
+    def _coalesce_messages(
+        self, messages: List[FormattedMessage]
+    ) -> List[FormattedMessage]:
+        """Merge adjacent messages that fit together within the length limit."""
+        merged: List[FormattedMessage] = []
+        for message in messages:
+            if not message.text.strip():
+                continue
+            if merged:
+                last = merged[-1]
+                if (
+                    last.parse_mode == message.parse_mode
+                    and last.reply_markup is None
+                    and message.reply_markup is None
+                    and len(last) + len(message) + 2 <= self.max_message_length
+                ):
+                    merged[-1] = FormattedMessage(
+                        f"{last.text}\n\n{message.text}", parse_mode=last.parse_mode
+                    )
+                    continue
+            merged.append(message)
+        return merged
+
     def _should_use_semantic_chunking(self, text: str) -> bool:
         """Determine if semantic chunking is needed."""
         # Use semantic chunking for complex content with multiple code blocks,
@@ -15,6 +15,9 @@ def escape_html(text: str) -> str:
     This replaces all 3 _escape_markdown functions previously scattered
     across the codebase.
     """
+    # Most names and previews contain none of them; skip the replace chain
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
     return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
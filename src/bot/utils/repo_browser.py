@@ -4,8 +4,9 @@ Provides directory listing, classification (branch vs leaf), and keyboard
 building for the /repo navigable directory browser.
 """
 
+import os
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from telegram import InlineKeyboardButton
 
@@ -22,32 +23,63 @@ FILTERED_DIRS = frozenset(
 )
 
 
+def _is_visible_dir(entry: os.DirEntry[str]) -> bool:
+    """Check a scandir entry against the listing filters.
+
+    Names are checked first so hidden and noise entries never need a stat.
+    """
+    name = entry.name
+    return not name.startswith(".") and name not in FILTERED_DIRS and entry.is_dir()
+
+
+def _scan_visible_children(directory: Path) -> List[Path]:
+    """List visible child directories; raises OSError if unreadable."""
+    with os.scandir(directory) as entries:
+        children = [Path(e.path) for e in entries if _is_visible_dir(e)]
+    children.sort(key=lambda d: d.name)
+    return children
+
+
 def list_visible_children(directory: Path) -> List[Path]:
     """List visible child directories, filtering dotfiles and noise."""
     try:
-        return sorted(
-            [
-                d
-                for d in directory.iterdir()
-                if d.is_dir()
-                and not d.name.startswith(".")
-                and d.name not in FILTERED_DIRS
-            ],
-            key=lambda d: d.name,
-        )
+        return _scan_visible_children(directory)
     except OSError:
         return []
 
 
 def is_branch_dir(directory: Path) -> bool:
     """Check if directory has visible child directories (is navigable)."""
-    return len(list_visible_children(directory)) > 0
+    try:
+        with os.scandir(directory) as entries:
+            return any(_is_visible_dir(e) for e in entries)
+    except OSError:
+        return False
+
+
+def scan_browse_entries(directory: Path) -> Optional[List[Tuple[Path, bool]]]:
+    """Like ``list_browse_entries``, but None if directory can't be listed.
+
+    Lets callers check that a directory exists and list it with a single
+    scandir instead of an ``is_dir()`` probe first.
+    """
+    try:
+        children = _scan_visible_children(directory)
+    except OSError:
+        return None
+    return [(child, is_branch_dir(child)) for child in children]
+
+
+def list_browse_entries(directory: Path) -> List[Tuple[Path, bool]]:
+    """List visible child directories paired with whether each is a branch."""
+    return scan_browse_entries(directory) or []
 
 
 def build_browser_keyboard(
     browse_dir: Path,
     workspace_root: Path,
     multi_root: bool = False,
+    entries: Optional[List[Tuple[Path, bool]]] = None,
 ) -> List[List[InlineKeyboardButton]]:
     """Build inline keyboard rows for directory browser.
 
@@ -55,6 +87,8 @@ def build_browser_keyboard(
         browse_dir: The directory currently being browsed.
         workspace_root: The workspace root this directory is under.
         multi_root: Whether there are multiple workspace roots.
+        entries: Precomputed ``list_browse_entries(browse_dir)``, if the
+            caller already has it.
 
     Returns:
         List of keyboard rows (each a list of InlineKeyboardButton).
@@ -72,14 +106,15 @@ def build_browser_keyboard(
     rows.append(nav_row)
 
     # Directory entries (2 per row)
-    children = list_visible_children(browse_dir)
-    for i in range(0, len(children), 2):
+    if entries is None:
+        entries = list_browse_entries(browse_dir)
+    for i in range(0, len(entries), 2):
         row: List[InlineKeyboardButton] = []
         for j in range(2):
-            if i + j < len(children):
-                child = children[i + j]
+            if i + j < len(entries):
+                child, is_branch = entries[i + j]
                 rel_path = str(child.relative_to(workspace_root))
-                prefix = "nav" if is_branch_dir(child) else "sel"
+                prefix = "nav" if is_branch else "sel"
                 row.append(
                     InlineKeyboardButton(
                         child.name, callback_data=f"{prefix}:{rel_path}"
@@ -36,6 +36,9 @@ class ClientManager:
         self._clients: dict[tuple[int, int, int], UserClient] = {}
         # Persisted model/betas preferences survive client eviction (idle timeout, crash)
         self._model_prefs: dict[tuple[int, int, int], tuple[str, list[str]]] = {}
+        # Keys whose stored row has already been checked for a model preference,
+        # so reconnects with a known session id skip the DB read
+        self._model_prefs_loaded: set[tuple[int, int, int]] = set()
 
     def _make_on_exit(
         self, user_id: int, chat_id: int, message_thread_id: int
@@ -97,11 +100,14 @@ class ClientManager:
 
         if not force_new:
             needs_session = resolved_session_id is None
-            needs_model = self._model_prefs.get(key) is None
+            needs_model = (
+                key not in self._model_prefs and key not in self._model_prefs_loaded
+            )
             if needs_session or needs_model:
                 db_session = await self._chat_session_repo.get(
                     chat_id, message_thread_id
                 )
+                self._model_prefs_loaded.add(key)
 
             if needs_session and db_session is not None and db_session.session_id:
                 resolved_session_id = db_session.session_id
@@ -294,6 +300,7 @@ class ClientManager:
             if client is not None:
                 await client.stop()
         self._model_prefs.clear()
+        self._model_prefs_loaded.clear()
 
     async def update_session_id(
         self,
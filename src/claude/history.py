@@ -8,7 +8,7 @@ import json
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, List, Optional
 
 import structlog
 
@@ -17,6 +17,29 @@ logger = structlog.get_logger()
 DEFAULT_HISTORY_PATH = Path.home() / ".claude" / "history.jsonl"
 DEFAULT_PROJECTS_DIR = Path.home() / ".claude" / "projects"
 
+# Parsed history per file, keyed by (st_mtime_ns, st_size) at parse time
+_history_cache: dict[Path, tuple[tuple[int, int], "HistoryIndex"]] = {}
+
+# First user message per transcript, keyed by (st_mtime_ns, st_size) at
+# parse time like the transcript cache; misses are not cached.
+_first_message_cache: dict[Path, tuple[tuple[int, int], str]] = {}
+_FIRST_MESSAGE_CACHE_SIZE = 256
+
+# Recent messages per (transcript, limit), keyed by (st_mtime_ns, st_size)
+# at parse time so an appended turn invalidates the entry.
+_transcript_cache: dict[
+    tuple[Path, int], tuple[tuple[int, int], list["TranscriptMessage"]]
+] = {}
+_TRANSCRIPT_CACHE_SIZE = 256
+
+
+def _bounded_put(cache: dict[Any, Any], key: Any, value: Any, max_size: int) -> None:
+    """Store *value* under *key*, evicting the oldest entry once full."""
+    if key not in cache and len(cache) >= max_size:
+        # Dicts keep insertion order; drop the oldest entry
+        del cache[next(iter(cache))]
+    cache[key] = value
+
 
 @dataclass(frozen=True)
 class HistoryEntry:
@@ -28,12 +51,49 @@ class HistoryEntry:
     project: str
 
 
+class HistoryIndex:
+    """Lookups over one parse of history.jsonl.
+
+    Shared between callers until the file changes; treat as read-only.
+    """
+
+    def __init__(self, entries: list[HistoryEntry]) -> None:
+        self.entries = entries  # newest first
+        self.by_id: dict[str, HistoryEntry] = {}
+        self.by_project: dict[str, list[HistoryEntry]] = {}
+        for entry in entries:
+            # First seen is newest, matching find_session_by_id
+            self.by_id.setdefault(entry.session_id, entry)
+            self.by_project.setdefault(entry.project, []).append(entry)
+
+    def count_for_directory(self, directory: Path) -> int:
+        """Count entries whose project resolves to directory.
+
+        Same matching as filter_by_directory, but each distinct project
+        path is compared once instead of once per entry.
+        """
+        try:
+            resolved_dir = directory.resolve()
+        except (OSError, RuntimeError):
+            resolved_dir = directory
+        resolved_dir_str = str(resolved_dir)
+        return sum(
+            len(project_entries)
+            for project, project_entries in self.by_project.items()
+            if project == resolved_dir_str or Path(project).resolve() == resolved_dir
+        )
+
+
+_EMPTY_HISTORY = HistoryIndex([])
+
+
 def read_claude_history(
     history_path: Path = DEFAULT_HISTORY_PATH,
 ) -> list[HistoryEntry]:
     """Read and parse history.jsonl.
 
-    Returns entries sorted newest first. Skips malformed lines.
+    Returns entries sorted newest first. Skips malformed lines. The parse
+    is cached until the file's mtime or size changes.
 
     Args:
         history_path: Path to history.jsonl file
@@ -41,9 +101,29 @@ def read_claude_history(
     Returns:
         List of HistoryEntry objects, sorted by timestamp descending
     """
-    if not history_path.exists():
+    return list(read_history_index(history_path).entries)
+
+
+def read_history_index(
+    history_path: Path = DEFAULT_HISTORY_PATH,
+) -> HistoryIndex:
+    """Return the indexed parse of history.jsonl.
+
+    Cached like read_claude_history, so repeated lookups on an unchanged
+    file cost one stat.
+    """
+    try:
+        stat = history_path.stat()
+    except OSError:
         logger.debug("History file not found", path=str(history_path))
-        return []
+        _history_cache.pop(history_path, None)
+        return _EMPTY_HISTORY
+
+    # Reuse the last parse while the file is unchanged on disk
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _history_cache.get(history_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
 
     entries: list[HistoryEntry] = []
     malformed_count = 0
@@ -98,7 +178,7 @@ def read_claude_history(
 
     except Exception as e:
         logger.error("Error reading history file", path=str(history_path), error=str(e))
-        return []
+        return _EMPTY_HISTORY
 
     if malformed_count > 0:
         logger.info(
@@ -116,7 +196,9 @@ def read_claude_history(
         path=str(history_path),
     )
 
-    return entries
+    index = HistoryIndex(entries)
+    _history_cache[history_path] = (signature, index)
+    return index
 
 
 def filter_by_directory(
@@ -141,14 +223,22 @@ def filter_by_directory(
             directory=str(directory),
             error=str(e),
         )
+        resolved_dir = directory
         resolved_dir_str = str(directory)
 
-    filtered = [
-        entry
-        for entry in entries
-        if Path(entry.project).resolve() == resolved_dir
-        or entry.project == resolved_dir_str
-    ]
+    # History repeats the same few project paths many times; resolve each
+    # distinct one once instead of hitting the filesystem per entry.
+    resolved_projects: dict[str, Path] = {}
+    filtered = []
+    for entry in entries:
+        project = entry.project
+        if project != resolved_dir_str:
+            resolved = resolved_projects.get(project)
+            if resolved is None:
+                resolved = resolved_projects[project] = Path(project).resolve()
+            if resolved != resolved_dir:
+                continue
+        filtered.append(entry)
 
     logger.debug(
         "Filtered history by directory",
@@ -281,19 +371,29 @@ def read_session_transcript(
 
     Returns:
         List of TranscriptMessage objects, chronological (oldest first),
-        limited to the most recent messages.
+        limited to the most recent messages. The result is cached until the
+        transcript's mtime or size changes.
     """
     slug = _project_slug(project_dir)
     transcript_path = projects_dir / slug / f"{session_id}.jsonl"
+    cache_key = (transcript_path, limit)
 
-    if not transcript_path.exists():
+    try:
+        stat = transcript_path.stat()
+    except OSError:
         logger.debug(
             "Session transcript not found",
             session_id=session_id,
             path=str(transcript_path),
         )
+        _transcript_cache.pop(cache_key, None)
         return []
 
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _transcript_cache.get(cache_key)
+    if cached is not None and cached[0] == signature:
+        return list(cached[1])
+
     messages: List[TranscriptMessage] = []
 
     try:
@@ -343,7 +443,12 @@ def read_session_transcript(
         return []
 
     # Return the most recent messages (limit applies to pairs loosely)
-    return messages[-(limit * 2) :]
+    recent = messages[-(limit * 2) :]
+
+    _bounded_put(
+        _transcript_cache, cache_key, (signature, recent), _TRANSCRIPT_CACHE_SIZE
+    )
+    return list(recent)
 
 
 def append_history_entry(
@@ -371,6 +476,7 @@ def append_history_entry(
         history_path.parent.mkdir(parents=True, exist_ok=True)
         with history_path.open("a") as f:
             f.write(json.dumps(entry) + "\n")
+        _history_cache.pop(history_path, None)
 
         logger.debug(
             "Appended history entry",
@@ -403,9 +509,17 @@ def read_first_message(
     slug = _project_slug(project_dir)
     transcript_path = projects_dir / slug / f"{session_id}.jsonl"
 
-    if not transcript_path.exists():
+    try:
+        stat = transcript_path.stat()
+    except OSError:
+        _first_message_cache.pop(transcript_path, None)
         return None
 
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _first_message_cache.get(transcript_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
     try:
         with transcript_path.open("r") as f:
             for line in f:
@@ -439,6 +553,12 @@ def read_first_message(
                 if not text or text.startswith("<"):
                     continue
 
+                _bounded_put(
+                    _first_message_cache,
+                    transcript_path,
+                    (signature, text),
+                    _FIRST_MESSAGE_CACHE_SIZE,
+                )
                 return text
 
     except Exception as e:
@@ -316,7 +316,11 @@ class UserClient:
             cost = 0.0
             num_turns = 0
 
-            content_blocks = item.query.to_content_blocks()
+            if item.query.attachments:
+                # Attachments base64-encode lazily; keep that off the loop
+                content_blocks = await asyncio.to_thread(item.query.to_content_blocks)
+            else:
+                content_blocks = item.query.to_content_blocks()
 
             async def _prompt_iter() -> AsyncIterator[dict[str, Any]]:
                 yield {
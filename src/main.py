@@ -10,6 +10,11 @@ from typing import Any, Dict, Optional
 
 import structlog
 
+try:  # libuv event loop when available; uvicorn[standard] pulls it in
+    import uvloop
+except ImportError:  # pragma: no cover - exercised only without uvloop
+    uvloop = None  # type: ignore[assignment]
+
 from src import __version__
 from src.bot.core import ClaudeCodeBot
 from src.claude.client_manager import DEFAULT_IDLE_TIMEOUT_SECONDS, ClientManager
@@ -223,6 +228,7 @@ async def create_application(config: Settings) -> Dict[str, Any]:
         "agent_handler": agent_handler,
         "auth_manager": auth_manager,
         "security_validator": security_validator,
+        "audit_logger": audit_logger,
     }
 
 
@@ -235,6 +241,7 @@ async def run_application(app: Dict[str, Any]) -> None:
     config: Settings = app["config"]
     features: FeatureFlags = app["features"]
     event_bus: EventBus = app["event_bus"]
+    audit_logger: AuditLogger = app["audit_logger"]
 
     notification_service: Optional[NotificationService] = None
     scheduler: Optional[JobScheduler] = None
@@ -353,6 +360,7 @@ async def run_application(app: Dict[str, Any]) -> None:
                 await notification_service.stop()
             await event_bus.stop()
             await bot.stop()
+            await audit_logger.close()
             await client_manager.disconnect_all()
             await storage.close()
         except Exception as e:
@@ -397,8 +405,9 @@ async def main() -> None:
 
 def run() -> None:
     """Synchronous entry point for setuptools."""
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
     try:
-        asyncio.run(main())
+        asyncio.run(main(), loop_factory=loop_factory)
     except KeyboardInterrupt:
         print("\nShutdown requested by user")
         sys.exit(0)
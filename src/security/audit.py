@@ -7,6 +7,7 @@ Features:
 - Security violations
 """
 
+import asyncio
 import json
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime, timedelta
@@ -18,6 +19,11 @@ import structlog
 
 logger = structlog.get_logger()
 
+# Events queued by AuditLogger.enqueue_command before writes apply backpressure
+_AUDIT_QUEUE_SIZE = 10_000
+# Most events handed to AuditStorage.store_events in one call
+_AUDIT_BATCH_SIZE = 100
+
 
 @dataclass
 class AuditEvent:
@@ -43,6 +49,20 @@ class AuditEvent:
         return json.dumps(self.to_dict(), default=str)
 
 
+@dataclass(slots=True, frozen=True)
+class _CommandRecord:
+    """Arguments of an enqueued command, turned into an AuditEvent later."""
+
+    timestamp: datetime
+    user_id: int
+    command: str
+    args: tuple[str, ...]
+    success: bool
+    working_directory: Optional[str]
+    execution_time: Optional[float]
+    exit_code: Optional[int]
+
+
 class AuditStorage:
     """Abstract interface for audit event storage."""
 
@@ -50,6 +70,14 @@ class AuditStorage:
         """Store audit event."""
         raise NotImplementedError
 
+    async def store_events(self, events: List[AuditEvent]) -> None:
+        """Store a batch of audit events.
+
+        Backends that can write several rows at once should override this.
+        """
+        for event in events:
+            await self.store_event(event)
+
     async def get_events(
         self,
         user_id: Optional[int] = None,
@@ -77,21 +105,26 @@ class InMemoryAuditStorage(AuditStorage):
 
     async def store_event(self, event: AuditEvent) -> None:
         """Store event in memory."""
-        self.events.append(event)
+        await self.store_events([event])
+
+    async def store_events(self, events: List[AuditEvent]) -> None:
+        """Store events in memory, trimming once per batch."""
+        self.events.extend(events)
 
         # Trim old events if we exceed limit
         if len(self.events) > self.max_events:
             self.events = self.events[-self.max_events :]
 
         # Log high-risk events immediately
-        if event.risk_level in ["high", "critical"]:
-            logger.warning(
-                "High-risk security event",
-                event_type=event.event_type,
-                user_id=event.user_id,
-                risk_level=event.risk_level,
-                details=event.details,
-            )
+        for event in events:
+            if event.risk_level in ["high", "critical"]:
+                logger.warning(
+                    "High-risk security event",
+                    event_type=event.event_type,
+                    user_id=event.user_id,
+                    risk_level=event.risk_level,
+                    details=event.details,
+                )
 
     async def get_events(
         self,
@@ -135,6 +168,11 @@ class AuditLogger:
 
     def __init__(self, storage: AuditStorage):
         self.storage = storage
+        # Created on first enqueue so they bind to the running loop
+        self._queue: Optional[asyncio.Queue[_CommandRecord]] = None
+        self._flusher: Optional[asyncio.Task[None]] = None
+        # Direct writes made while the queue was full
+        self._overflow: set[asyncio.Task[None]] = set()
         logger.info("Audit logger initialized")
 
     async def log_auth_attempt(
@@ -198,11 +236,125 @@ class AuditLogger:
         exit_code: Optional[int] = None,
     ) -> None:
         """Log command execution."""
+        event = self._command_event(
+            user_id,
+            command,
+            args,
+            success,
+            working_directory,
+            execution_time,
+            exit_code,
+        )
+        await self.storage.store_event(event)
+
+    def enqueue_command(
+        self,
+        user_id: int,
+        command: str,
+        args: List[str],
+        success: bool,
+        working_directory: Optional[str] = None,
+        execution_time: Optional[float] = None,
+        exit_code: Optional[int] = None,
+    ) -> None:
+        """Log command execution without waiting for storage.
+
+        Only the arguments are captured here; the background task builds
+        the events and writes them in batches of up to
+        ``_AUDIT_BATCH_SIZE``. If the queue is full the event is written
+        directly instead. Must be called from a running event loop.
+        """
+        record = _CommandRecord(
+            datetime.now(UTC),
+            user_id,
+            command,
+            tuple(args),
+            success,
+            working_directory,
+            execution_time,
+            exit_code,
+        )
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=_AUDIT_QUEUE_SIZE)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop(self._queue))
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            event = self._record_event(record)
+            task = asyncio.create_task(self.storage.store_event(event))
+            self._overflow.add(task)
+            task.add_done_callback(self._overflow.discard)
+
+    async def flush(self) -> None:
+        """Wait until every enqueued event has been stored."""
+        if self._queue is not None:
+            await self._queue.join()
+        if self._overflow:
+            await asyncio.gather(*self._overflow, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Flush pending events and stop the background writer."""
+        await self.flush()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+    async def _flush_loop(self, queue: "asyncio.Queue[_CommandRecord]") -> None:
+        """Store queued commands, draining whatever is ready into one batch."""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < _AUDIT_BATCH_SIZE:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self.storage.store_events(
+                    [self._record_event(record) for record in batch]
+                )
+            except Exception as e:
+                logger.error(
+                    "Failed to store audit events", error=str(e), count=len(batch)
+                )
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _record_event(self, record: _CommandRecord) -> AuditEvent:
+        """Build the event for a command captured by enqueue_command."""
+        return self._command_event(
+            record.user_id,
+            command=record.command,
+            args=list(record.args),
+            success=record.success,
+            working_directory=record.working_directory,
+            execution_time=record.execution_time,
+            exit_code=record.exit_code,
+            timestamp=record.timestamp,
+        )
+
+    def _command_event(
+        self,
+        user_id: int,
+        command: str,
+        args: List[str],
+        success: bool,
+        working_directory: Optional[str],
+        execution_time: Optional[float],
+        exit_code: Optional[int],
+        timestamp: Optional[datetime] = None,
+    ) -> AuditEvent:
+        """Build a command event and emit the structured log line."""
         # Determine risk level based on command
         risk_level = self._assess_command_risk(command, args)
 
         event = AuditEvent(
-            timestamp=datetime.now(UTC),
+            timestamp=timestamp or datetime.now(UTC),
             user_id=user_id,
             event_type="command",
             success=success,
@@ -216,8 +368,6 @@ class AuditLogger:
             risk_level=risk_level,
         )
 
-        await self.storage.store_event(event)
-
         logger.info(
             "Command execution logged",
             user_id=user_id,
@@ -225,6 +375,7 @@ class AuditLogger:
             success=success,
             risk_level=risk_level,
         )
+        return event
 
     async def log_file_access(
         self,
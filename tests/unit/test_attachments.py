@@ -7,26 +7,58 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from src.bot.attachments import (
+    _B64_CHUNK_SIZE,
     Attachment,
     AttachmentProcessor,
     MediaGroupCollector,
     Query,
     UnsupportedAttachmentError,
+    _detect_image_type,
+    _encode_b64_ascii,
+    _file_extension,
 )
 
 
 def make_attachment(filename: str = "photo.jpg") -> Attachment:
     return Attachment(
-        content_block={
-            "type": "image",
-            "source": {"type": "base64", "media_type": "image/jpeg", "data": "abc123"},
-        },
         filename=filename,
         size=1024,
         media_type="image/jpeg",
+        kind="image",
+        data=b"\xff\xd8\xff",
     )
 
 
+class TestAttachment:
+    def test_image_block_encoded_on_first_access(self) -> None:
+        att = make_attachment()
+        assert att._content_block is None
+        block = att.content_block
+        assert block == {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": "image/jpeg",
+                "data": base64.standard_b64encode(b"\xff\xd8\xff").decode(),
+            },
+        }
+        assert att.content_block is block
+
+    def test_text_document_block(self) -> None:
+        att = Attachment(
+            filename="notes.md",
+            size=5,
+            media_type="text/markdown",
+            kind="document",
+            data="hello",
+        )
+        assert att.content_block == {
+            "type": "document",
+            "source": {"type": "text", "media_type": "text/plain", "data": "hello"},
+            "title": "notes.md",
+        }
+
+
 class TestQuery:
     def test_text_only(self) -> None:
         q = Query(text="hello")
@@ -45,6 +77,10 @@ class TestQuery:
         with pytest.raises(AttributeError):
             q.text = "changed"  # type: ignore[misc]
 
+    def test_slots(self) -> None:
+        assert not hasattr(Query(text="hello"), "__dict__")
+        assert not hasattr(make_attachment(), "__dict__")
+
     def test_default_no_text(self) -> None:
         att = make_attachment()
         q = Query(attachments=(att,))
@@ -77,6 +113,54 @@ class TestQuery:
         assert blocks == []
 
 
+class TestDetectImageType:
+    @pytest.mark.parametrize(
+        ("data", "expected"),
+        [
+            (b"\x89PNG\r\n\x1a\n" + b"\x00" * 8, ("image/png", "png")),
+            (b"\xff\xd8\xff\xe0", ("image/jpeg", "jpeg")),
+            (b"GIF87a...", ("image/gif", "gif")),
+            (b"GIF89a...", ("image/gif", "gif")),
+            (b"RIFF\x00\x00\x00\x00WEBP", ("image/webp", "webp")),
+        ],
+    )
+    def test_known_signatures(self, data: bytes, expected: tuple[str, str]) -> None:
+        assert _detect_image_type(data) == expected
+
+    def test_shared_lead_byte_without_match(self) -> None:
+        assert _detect_image_type(b"GIF90a") is None
+
+    def test_non_image(self) -> None:
+        assert _detect_image_type(b"%PDF-1.4") is None
+
+    def test_empty(self) -> None:
+        assert _detect_image_type(b"") is None
+
+
+class TestEncodeB64Ascii:
+    @pytest.mark.parametrize(
+        "size", [0, 1, _B64_CHUNK_SIZE, _B64_CHUNK_SIZE + 1, 2 * _B64_CHUNK_SIZE + 2]
+    )
+    def test_matches_stdlib(self, size: int) -> None:
+        data = bytearray(i % 251 for i in range(size))
+        assert _encode_b64_ascii(data) == base64.standard_b64encode(data).decode()
+
+
+class TestFileExtension:
+    @pytest.mark.parametrize(
+        ("filename", "expected"),
+        [
+            ("script.PY", "py"),
+            ("archive.tar.gz", "gz"),
+            ("Makefile", ""),
+            (".gitignore", "gitignore"),
+            ("trailing.", ""),
+        ],
+    )
+    def test_extension(self, filename: str, expected: str) -> None:
+        assert _file_extension(filename) == expected
+
+
 class TestUnsupportedAttachmentError:
     def test_attributes(self) -> None:
         err = UnsupportedAttachmentError("file.docx", "application/vnd.openxmlformats")
@@ -149,6 +233,40 @@ class TestMediaGroupCollector:
         assert result_a is not None and len(result_a) == 1
         assert result_b is not None and len(result_b) == 1
 
+    @pytest.mark.asyncio
+    async def test_window_slides_with_each_item(self) -> None:
+        collector = MediaGroupCollector(timeout=0.15)
+        await collector.add(_make_update(media_group_id="group_1", message_id=1))
+        await asyncio.sleep(0.1)
+        await collector.add(_make_update(media_group_id="group_1", message_id=2))
+        await asyncio.sleep(0.1)
+        # 0.2s since the first item, but only 0.1s since the last
+        assert collector.pop_ready("group_1") is None
+        await asyncio.sleep(0.1)
+        result = collector.pop_ready("group_1")
+        assert result is not None and len(result) == 2
+
+    @pytest.mark.asyncio
+    async def test_straggler_reopens_unpopped_group(self) -> None:
+        collector = MediaGroupCollector(timeout=0.05)
+        await collector.add(_make_update(media_group_id="group_1", message_id=1))
+        await asyncio.sleep(0.1)
+        await collector.add(_make_update(media_group_id="group_1", message_id=2))
+        assert collector.pop_ready("group_1") is None
+        await asyncio.sleep(0.1)
+        result = collector.pop_ready("group_1")
+        assert result is not None and len(result) == 2
+
+    @pytest.mark.asyncio
+    async def test_single_sweeper_task_for_all_groups(self) -> None:
+        collector = MediaGroupCollector(timeout=0.1)
+        before = len(asyncio.all_tasks())
+        for i in range(5):
+            await collector.add(_make_update(media_group_id=f"g{i}", message_id=i))
+        assert len(asyncio.all_tasks()) == before + 1
+        await asyncio.sleep(0.2)
+        assert all(collector.pop_ready(f"g{i}") is not None for i in range(5))
+
 
 # ---------------------------------------------------------------------------
 # AttachmentProcessor test helpers
@@ -218,6 +336,18 @@ class TestAttachmentProcessorPhoto:
         assert att.media_type == "image/png"
         assert att.size == len(_PNG_HEADER)
 
+    @pytest.mark.asyncio
+    async def test_photo_keeps_downloaded_buffer(self) -> None:
+        processor = AttachmentProcessor()
+        message = _make_photo_message(_PNG_HEADER)
+        tg_file = await message.photo[-1].get_file()
+        buffer = bytearray(_PNG_HEADER)
+        tg_file.download_as_bytearray = AsyncMock(return_value=buffer)
+
+        att = await processor.process(message)
+
+        assert att.data is buffer
+
     @pytest.mark.asyncio
     async def test_photo_jpeg_detection(self) -> None:
         processor = AttachmentProcessor()
@@ -282,6 +412,17 @@ class TestAttachmentProcessorDocument:
         assert att.content_block["source"]["type"] == "text"
         assert att.content_block["source"]["data"] == _CSV_CONTENT.decode("utf-8")
 
+    @pytest.mark.asyncio
+    async def test_yaml_mime_detected_as_text(self) -> None:
+        # Extension is not a known text one, so only the MIME type can match
+        processor = AttachmentProcessor()
+        content = b"key: value\n"
+        message = _make_document_message(content, "pipeline.ci", "application/x-yaml")
+        att = await processor.process(message)
+
+        assert att.content_block["source"]["type"] == "text"
+        assert att.media_type == "application/x-yaml"
+
     @pytest.mark.asyncio
     async def test_unknown_text_extension_detected(self) -> None:
         # .ini has no MIME but is in _TEXT_EXTENSIONS
@@ -315,6 +456,16 @@ class TestAttachmentProcessorDocument:
         assert exc_info.value.filename == "file.bin"
         assert exc_info.value.mime_type is None
 
+    @pytest.mark.asyncio
+    async def test_nul_prefixed_file_rejected_without_decode(self) -> None:
+        # Valid UTF-8 overall, but the leading NUL marks it as binary
+        processor = AttachmentProcessor()
+        content = b"\x00" + b"a" * 8192
+        message = _make_document_message(content, "blob.dat", None)
+
+        with pytest.raises(UnsupportedAttachmentError):
+            await processor.process(message)
+
     @pytest.mark.asyncio
     async def test_no_photo_no_document_raises(self) -> None:
         processor = AttachmentProcessor()
@@ -324,3 +475,78 @@ class TestAttachmentProcessorDocument:
 
         with pytest.raises(ValueError, match="no photo or document"):
             await processor.process(message)
+
+
+class TestAttachmentProcessorMany:
+    @pytest.mark.asyncio
+    async def test_process_many_preserves_order(self) -> None:
+        processor = AttachmentProcessor()
+        messages = [
+            _make_photo_message(_PNG_HEADER),
+            _make_document_message(_PY_CONTENT, "script.py", "text/x-python"),
+            _make_photo_message(_JPEG_HEADER),
+        ]
+        attachments = await processor.process_many(messages)
+
+        assert [a.media_type for a in attachments] == [
+            "image/png",
+            "text/x-python",
+            "image/jpeg",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_process_many_downloads_concurrently(self) -> None:
+        processor = AttachmentProcessor()
+        in_flight = 0
+        peak = 0
+
+        async def slow_download() -> bytearray:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return bytearray(_PNG_HEADER)
+
+        messages = []
+        for _ in range(3):
+            message = _make_photo_message(_PNG_HEADER)
+            tg_file = await message.photo[-1].get_file()
+            tg_file.download_as_bytearray = slow_download
+            messages.append(message)
+
+        await processor.process_many(messages)
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_process_many_propagates_unsupported(self) -> None:
+        processor = AttachmentProcessor()
+        messages = [
+            _make_photo_message(_PNG_HEADER),
+            _make_document_message(_BINARY_CONTENT, "file.bin", None),
+        ]
+        with pytest.raises(UnsupportedAttachmentError):
+            await processor.process_many(messages)
+
+    @pytest.mark.asyncio
+    async def test_process_many_cancels_remaining_on_failure(self) -> None:
+        processor = AttachmentProcessor()
+        cancelled = False
+
+        async def hanging_download() -> bytearray:
+            nonlocal cancelled
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            return bytearray(_PNG_HEADER)
+
+        slow = _make_photo_message(_PNG_HEADER)
+        tg_file = await slow.photo[-1].get_file()
+        tg_file.download_as_bytearray = hanging_download
+        messages = [slow, _make_document_message(_BINARY_CONTENT, "file.bin", None)]
+
+        with pytest.raises(UnsupportedAttachmentError):
+            await processor.process_many(messages)
+        assert cancelled
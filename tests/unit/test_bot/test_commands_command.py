@@ -125,6 +125,24 @@ async def test_commands_no_arg_hint_uses_callback(
     assert button.callback_data == "skill:deploy"
 
 
+@pytest.mark.asyncio
+async def test_commands_keyboard_capped_at_100_rows(
+    orchestrator, mock_update, mock_context
+):
+    """Test only the first 100 skills get a button row."""
+    mock_client_manager = MagicMock()
+    mock_client_manager.get_available_commands.return_value = [
+        {"name": f"skill{i}", "description": ""} for i in range(120)
+    ]
+    mock_context.bot_data = {"client_manager": mock_client_manager}
+
+    await orchestrator.handle_commands(mock_update, mock_context)
+
+    reply_markup = mock_update.message.reply_text.call_args[1]["reply_markup"]
+    assert len(reply_markup.inline_keyboard) == 100
+    assert reply_markup.inline_keyboard[-1][0].callback_data == "skill:skill99"
+
+
 # --- Skill text invocation tests ---
 
 
@@ -151,13 +169,11 @@ async def test_skill_text_passthrough(orchestrator, mock_update, mock_context):
         "claude_session_id": "old-session",
     }
 
-    with patch("src.bot.utils.formatting.ResponseFormatter") as mock_formatter_class:
-        mock_formatter = MagicMock()
+    with patch.object(orchestrator, "_formatter") as mock_formatter:
         mock_formatted_msg = MagicMock()
         mock_formatted_msg.text = "Deployed to production"
         mock_formatted_msg.parse_mode = "HTML"
         mock_formatter.format_claude_response.return_value = [mock_formatted_msg]
-        mock_formatter_class.return_value = mock_formatter
 
         with patch.object(orchestrator, "_start_typing_heartbeat") as mock_heartbeat:
             mock_heartbeat.return_value = MagicMock()
@@ -227,13 +243,11 @@ async def test_skill_callback_passthrough(orchestrator, mock_context):
         "claude_session_id": "old-session",
     }
 
-    with patch("src.bot.utils.formatting.ResponseFormatter") as mock_formatter_class:
-        mock_formatter = MagicMock()
+    with patch.object(orchestrator, "_formatter") as mock_formatter:
         mock_formatted_msg = MagicMock()
         mock_formatted_msg.text = "Deployment complete"
         mock_formatted_msg.parse_mode = "HTML"
         mock_formatter.format_claude_response.return_value = [mock_formatted_msg]
-        mock_formatter_class.return_value = mock_formatter
 
         with patch.object(orchestrator, "_start_typing_heartbeat") as mock_heartbeat:
             mock_heartbeat.return_value = MagicMock()
@@ -250,3 +264,6 @@ async def test_skill_callback_passthrough(orchestrator, mock_context):
     assert query_arg is not None
     assert query_arg.text == "/deploy"
     assert "<skill-invocation>" not in query_arg.text
+    # Progress and response are replies to the keyboard message
+    sent = [c.args[0] for c in mock_query.message.reply_text.call_args_list]
+    assert sent == ["Working...", "Deployment complete"]
@@ -143,6 +143,39 @@ class TestCompactCommand:
         assert any("Compacting" in str(call) for call in calls)
         assert any("compacted" in str(call) for call in calls)
 
+    @pytest.mark.asyncio
+    async def test_compact_reseed_carries_summary(
+        self, orchestrator, mock_update, mock_context
+    ):
+        """The new session's first prompt embeds the summary verbatim."""
+        mock_context.user_data = {
+            "claude_session_id": "old-session-123",
+            "current_directory": "/tmp/test",
+        }
+
+        summary_result = MagicMock(
+            response_text="  • Use {braces} as-is  ",
+            session_id="old-session-123",
+            cost=None,
+            duration_ms=None,
+            num_turns=1,
+        )
+        ack_result = MagicMock(
+            response_text="OK",
+            session_id="new-session-456",
+            cost=None,
+            duration_ms=None,
+            num_turns=1,
+        )
+        cm = _make_client_manager(summary_result, ack_result)
+        mock_context.bot_data["client_manager"] = cm
+
+        await orchestrator.handle_compact(mock_update, mock_context)
+
+        reseed_query = cm._client.submit.call_args_list[1].args[0]
+        assert "\n\n• Use {braces} as-is\n\n" in reseed_query.text
+        assert cm.get_or_connect.call_args_list[1].kwargs["force_new"] is True
+
     @pytest.mark.asyncio
     async def test_compact_handles_claude_error(
         self, orchestrator, mock_update, mock_context
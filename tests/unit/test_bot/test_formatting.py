@@ -1,6 +1,6 @@
 """Tests for response formatting utilities."""
 
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
@@ -89,6 +89,40 @@ class TestResponseFormatter:
         for msg in messages:
             assert len(msg.text) <= formatter.max_message_length
 
+    def test_blank_response_skips_formatting(self, formatter):
+        """Test whitespace-only content returns the placeholder directly."""
+        with patch.object(formatter, "_clean_text") as clean:
+            messages = formatter.format_claude_response(" \n\t ")
+
+        clean.assert_not_called()
+        assert [m.text for m in messages] == ["<i>(No content to display)</i>"]
+        assert messages[0].reply_markup is None
+
+    def test_semantic_chunks_are_coalesced(self, formatter):
+        """Small semantic sections share one message when they fit."""
+        text = (
+            "Creating file `a.py`\n\n"
+            "First step.\n\n```python\nx = 1\n```\n\n"
+            "Second step.\n\n```python\ny = 2\n```\n\n"
+            "Third step.\n\n```python\nz = 3\n```\n"
+        )
+        messages = formatter.format_claude_response(text)
+
+        assert len(messages) == 1
+        assert "File Operations" in messages[0].text
+        assert "z = 3" in messages[0].text
+
+    def test_coalesce_respects_length_and_parse_mode(self, formatter):
+        """Messages are only merged while the result stays under the limit."""
+        big = FormattedMessage("a" * 3000)
+        small = FormattedMessage("b" * 500)
+        plain = FormattedMessage("c", parse_mode=None)
+
+        merged = formatter._coalesce_messages([small, small, big, plain])
+
+        assert [len(m) for m in merged] == [1002, 3000, 1]
+        assert merged[2].parse_mode is None
+
     def test_format_error_message(self, formatter):
         """Test error message formatting."""
         error_msg = formatter.format_error_message("Something went wrong", "Error")
@@ -273,6 +307,13 @@ class TestEscapeHtml:
     def test_no_change_for_safe_text(self):
         assert escape_html("hello world") == "hello world"
 
+    def test_safe_text_returned_as_is(self):
+        text = "project-name/src"
+        assert escape_html(text) is text
+
+    def test_escape_only_closing_bracket(self):
+        assert escape_html("a > b") == "a &gt; b"
+
     def test_escape_all_three(self):
         assert escape_html("a & <b> & c") == "a &amp; &lt;b&gt; &amp; c"
 
@@ -170,6 +170,19 @@ class TestMiddlewareBlocksSubsequentGroups:
         assert "settings" in captured_data
 
 
+def test_seed_bot_data_includes_late_dependencies(bot, mock_settings):
+    """Dependencies added after initialize still land in bot_data at start."""
+    bot.app = MagicMock()
+    bot.app.bot_data = {}
+    bot.deps["project_threads_manager"] = MagicMock()
+
+    bot._seed_bot_data()
+
+    assert bot.app.bot_data["settings"] is mock_settings
+    for key, value in bot.deps.items():
+        assert bot.app.bot_data[key] is value
+
+
 @pytest.mark.asyncio
 async def test_middleware_wrapper_stops_bot_originated_updates() -> None:
     """Middleware wrapper should stop updates sent by bot users."""
@@ -92,7 +92,7 @@ class TestSummarizeToolInput:
 class TestProgressMessageManagerRender:
     def test_empty_log_shows_working(self) -> None:
         msg = AsyncMock()
-        pm = ProgressMessageManager(initial_message=msg, start_time=time.time())
+        pm = ProgressMessageManager(initial_message=msg, start_time=time.monotonic())
         text = pm.render()
         assert text.startswith("Working...")
 
@@ -175,7 +175,9 @@ class TestProgressMessageManagerRender:
 class TestProgressMessageManagerFinalize:
     def test_finalize_changes_header(self) -> None:
         msg = AsyncMock()
-        pm = ProgressMessageManager(initial_message=msg, start_time=time.time() - 42)
+        pm = ProgressMessageManager(
+            initial_message=msg, start_time=time.monotonic() - 42
+        )
         text_before = pm.render()
         assert "Working..." in text_before
         finalized = pm.render(done=True)
@@ -349,6 +351,13 @@ class TestBuildStreamCallback:
         assert pm.activity_log[0].content == "first"
         assert pm.activity_log[2].content == "second"
 
+    async def test_on_event_called_per_event(self, pm: ProgressMessageManager) -> None:
+        events = []
+        cb = build_stream_callback(pm, on_event=lambda: events.append(None))
+        await cb("text", "first")
+        await cb("tool_use", {"name": "Read", "input": {}})
+        assert len(events) == 2
+
 
 # ---------------------------------------------------------------------------
 # Task 11: End-to-end integration tests
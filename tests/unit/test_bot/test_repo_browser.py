@@ -9,8 +9,10 @@ from src.bot.utils.repo_browser import (
     build_browse_header,
     build_browser_keyboard,
     is_branch_dir,
+    list_browse_entries,
     list_visible_children,
     resolve_browse_path,
+    scan_browse_entries,
 )
 
 
@@ -79,6 +81,40 @@ def test_branch_ignores_filtered_children(tmp_path):
     assert is_branch_dir(d) is False
 
 
+def test_branch_dir_ignores_files(tmp_path):
+    """A file child does not make a directory navigable."""
+    d = tmp_path / "proj"
+    d.mkdir()
+    (d / "README.md").write_text("hi")
+    assert is_branch_dir(d) is False
+
+
+def test_list_browse_entries_pairs_branch_flags(workspace):
+    entries = list_browse_entries(workspace)
+    assert entries == [
+        (workspace / "projectA", True),
+        (workspace / "projectB", False),
+    ]
+
+
+def test_scan_browse_entries_distinguishes_missing_dir(workspace):
+    assert scan_browse_entries(workspace / "projectB") == []
+    assert scan_browse_entries(workspace / "missing") is None
+    (workspace / "notes.txt").write_text("")
+    assert scan_browse_entries(workspace / "notes.txt") is None
+
+
+def test_keyboard_uses_precomputed_entries(workspace):
+    """Given entries, the keyboard does not list the directory again."""
+    rows = build_browser_keyboard(
+        browse_dir=workspace,
+        workspace_root=workspace,
+        entries=[(workspace / "projectB", True)],
+    )
+    dir_buttons = [btn for row in rows[1:] for btn in row]
+    assert [b.callback_data for b in dir_buttons] == ["nav:projectB"]
+
+
 def test_keyboard_has_dot_and_dotdot(workspace):
     """First row should have . and .. buttons."""
     rows = build_browser_keyboard(
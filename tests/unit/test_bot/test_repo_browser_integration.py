@@ -1,6 +1,8 @@
 """Integration tests for repo directory browser callbacks."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -79,6 +81,31 @@ async def test_old_cd_callback_still_switches_directory(orchestrator, workspace)
     assert "session resumed" not in text
 
 
+async def test_cd_callback_replies_while_disconnect_runs(orchestrator, workspace):
+    """The cd reply is sent without waiting for the SDK disconnect."""
+    query = MagicMock()
+    query.data = f"cd:{workspace / 'projectB'}"
+    query.from_user.id = 123
+    disconnect_started = asyncio.Event()
+    replied = asyncio.Event()
+    query.edit_message_text = AsyncMock(side_effect=lambda *a, **kw: replied.set())
+
+    async def disconnect(*args):
+        disconnect_started.set()
+        await replied.wait()
+
+    update = MagicMock()
+    update.callback_query = query
+    client_mgr = MagicMock()
+    client_mgr.disconnect = disconnect
+
+    ctx = _make_context(bot_data={"client_manager": client_mgr})
+    await asyncio.wait_for(orchestrator._handle_callback(update, ctx), timeout=1)
+
+    assert disconnect_started.is_set()
+    query.edit_message_text.assert_awaited_once()
+
+
 async def test_old_cd_callback_not_found(orchestrator, workspace):
     """Old cd: callback with nonexistent path shows error."""
     query = MagicMock()
@@ -123,3 +150,66 @@ async def test_old_cd_callback_outside_roots_rejected(orchestrator, workspace):
     query.edit_message_text.assert_called_once()
     text = query.edit_message_text.call_args[0][0]
     assert "not found" in text.lower()
+
+
+async def test_nav_callback_resets_unapproved_browse_root(
+    orchestrator, workspace, tmp_path_factory
+):
+    """A browse root that is not an approved directory falls back to the default."""
+    query = MagicMock()
+    query.answer = AsyncMock()
+    query.data = "nav:projectA"
+    query.from_user.id = 123
+    query.edit_message_text = AsyncMock()
+    query.message.edit_text = AsyncMock()
+
+    update = MagicMock()
+    update.callback_query = query
+
+    ctx = _make_context(
+        user_data={"repo_browse_root": tmp_path_factory.mktemp("elsewhere")}
+    )
+
+    await orchestrator._handle_callback(update, ctx)
+
+    assert ctx.user_data["repo_browse_root"] == workspace
+    assert ctx.user_data["repo_browse_rel"] == "projectA"
+
+
+async def test_nav_up_callback_stores_parent(orchestrator, workspace):
+    """nav:.. writes the parent path back to the browser state."""
+    query = MagicMock()
+    query.answer = AsyncMock()
+    query.data = "nav:.."
+    query.from_user.id = 123
+    query.message.edit_text = AsyncMock()
+
+    update = MagicMock()
+    update.callback_query = query
+
+    ctx = _make_context(user_data={"repo_browse_rel": "projectA/src"})
+
+    await orchestrator._handle_callback(update, ctx)
+
+    assert ctx.user_data["repo_browse_root"] == workspace
+    assert ctx.user_data["repo_browse_rel"] == "projectA"
+    query.message.edit_text.assert_awaited_once()
+
+
+async def test_sel_callback_denies_escape_before_stat(orchestrator, workspace):
+    """A sel: target outside the approved roots is denied without an is_dir probe."""
+    query = MagicMock()
+    query.answer = AsyncMock()
+    query.data = "sel:../.."
+    query.from_user.id = 123
+    query.edit_message_text = AsyncMock()
+
+    update = MagicMock()
+    update.callback_query = query
+
+    with patch.object(Path, "is_dir", side_effect=AssertionError("stat")):
+        await orchestrator._handle_callback(update, _make_context())
+
+    query.edit_message_text.assert_awaited_once_with(
+        "Access denied.", parse_mode="HTML"
+    )
@@ -1,5 +1,6 @@
 """Tests for /resume command (session picker) and session callbacks."""
 
+import asyncio
 from datetime import UTC, datetime
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -190,7 +191,7 @@ async def test_session_callback_resumes(orchestrator, mock_settings):
 
 
 async def test_session_callback_new(orchestrator, mock_settings):
-    """Tapping New Session button calls get_or_connect (eager connect)."""
+    """Tapping New Session replies at once and connects in the background."""
     settings, _ = mock_settings
 
     query = MagicMock()
@@ -204,9 +205,14 @@ async def test_session_callback_new(orchestrator, mock_settings):
 
     mock_client = MagicMock()
     mock_client.session_id = "new-sess-xyz"
+    connect_gate = asyncio.Event()
+
+    async def get_or_connect(**kwargs):
+        await connect_gate.wait()
+        return mock_client
 
     mock_client_manager = MagicMock()
-    mock_client_manager.get_or_connect = AsyncMock(return_value=mock_client)
+    mock_client_manager.get_or_connect = AsyncMock(side_effect=get_or_connect)
 
     context = MagicMock()
     context.user_data = {}
@@ -218,6 +224,13 @@ async def test_session_callback_new(orchestrator, mock_settings):
 
     await orchestrator._handle_callback(update, context)
 
+    # Replied before the connect finished
+    query.edit_message_text.assert_called_once()
+    assert context.user_data.get("force_new_session") is True
+    connect_gate.set()
+    await asyncio.gather(*orchestrator._pending_connects.values())
+    assert orchestrator._pending_connects == {}
+
     # Check get_or_connect was called (eager connect)
     mock_client_manager.get_or_connect.assert_called_once()
     call_kwargs = mock_client_manager.get_or_connect.call_args.kwargs
@@ -2,6 +2,7 @@
 
 import json
 from pathlib import Path
+from unittest.mock import patch
 
 from src.claude.history import (
     HistoryEntry,
@@ -10,6 +11,8 @@ from src.claude.history import (
     filter_by_directory,
     find_session_by_id,
     read_claude_history,
+    read_first_message,
+    read_history_index,
     read_session_transcript,
 )
 
@@ -148,6 +151,34 @@ class TestReadClaudeHistory:
         assert result[1].session_id == "middle-id"
         assert result[2].session_id == "old-id"
 
+    def test_unchanged_file_is_not_reparsed(self, tmp_path: Path) -> None:
+        """A second read of an unchanged file reuses the cached parse."""
+        history_file = tmp_path / "history.jsonl"
+        history_file.write_text(
+            json.dumps(
+                {"display": "A", "timestamp": 1, "project": "/p", "sessionId": "a"}
+            )
+            + "\n"
+        )
+
+        first = read_claude_history(history_file)
+        with patch.object(Path, "open", side_effect=AssertionError("re-read")):
+            second = read_claude_history(history_file)
+
+        assert second == first
+        assert second is not first
+
+    def test_append_invalidates_cache(self, tmp_path: Path) -> None:
+        """Entries appended by the bot show up on the next read."""
+        history_file = tmp_path / "history.jsonl"
+        append_history_entry("s1", "First", "/proj", history_file)
+        assert [e.session_id for e in read_claude_history(history_file)] == ["s1"]
+
+        append_history_entry("s2", "Second", "/proj", history_file)
+
+        ids = {e.session_id for e in read_claude_history(history_file)}
+        assert ids == {"s1", "s2"}
+
 
 class TestFilterByDirectory:
     """Tests for filtering entries by directory."""
@@ -207,6 +238,32 @@ class TestFilterByDirectory:
         result = filter_by_directory(entries, target_dir)
         assert result == []
 
+    def test_filter_resolves_each_project_once(self, tmp_path: Path) -> None:
+        """Repeated project paths are resolved a single time per call."""
+        target_dir = tmp_path / "target"
+        target_dir.mkdir()
+        link = tmp_path / "link"
+        link.symlink_to(target_dir)
+
+        entries = [
+            HistoryEntry(
+                session_id=f"id-{i}",
+                display="Linked",
+                timestamp=i,
+                project=str(link),
+            )
+            for i in range(5)
+        ]
+
+        with patch.object(
+            Path, "resolve", autospec=True, side_effect=Path.resolve
+        ) as resolve:
+            result = filter_by_directory(entries, target_dir)
+
+        assert len(result) == 5
+        # Once for the target directory, once for the shared project path
+        assert resolve.call_count == 2
+
 
 class TestFindSessionById:
     """Tests for finding a session entry by ID."""
@@ -239,6 +296,42 @@ class TestFindSessionById:
         assert result is None
 
 
+class TestReadHistoryIndex:
+    """Tests for the indexed history lookups."""
+
+    def test_index_lookups_match_list_helpers(self, tmp_path: Path) -> None:
+        """by_id and count_for_directory agree with the list-based helpers."""
+        target_dir = tmp_path / "target"
+        target_dir.mkdir()
+        link = tmp_path / "link"
+        link.symlink_to(target_dir)
+        history_file = tmp_path / "history.jsonl"
+        append_history_entry("s1", "Old", str(target_dir), history_file)
+        append_history_entry("s2", "Linked", str(link), history_file)
+        append_history_entry("s3", "Other", "/other", history_file)
+
+        index = read_history_index(history_file)
+        entries = read_claude_history(history_file)
+
+        assert index.by_id["s2"] == find_session_by_id(entries, "s2")
+        assert "missing" not in index.by_id
+        assert index.count_for_directory(target_dir) == len(
+            filter_by_directory(entries, target_dir)
+        )
+        assert index.count_for_directory(target_dir) == 2
+
+    def test_index_shared_until_file_changes(self, tmp_path: Path) -> None:
+        """The same index is returned while history.jsonl is unchanged."""
+        history_file = tmp_path / "history.jsonl"
+        append_history_entry("s1", "First", "/proj", history_file)
+
+        first = read_history_index(history_file)
+        assert read_history_index(history_file) is first
+
+        append_history_entry("s2", "Second", "/proj", history_file)
+        assert "s2" in read_history_index(history_file).by_id
+
+
 class TestCheckHistoryFormatHealth:
     """Tests for checking history file format health."""
 
@@ -422,6 +515,96 @@ class TestReadSessionTranscript:
         )
         assert msgs == []
 
+    def test_unchanged_transcript_is_not_reparsed(self, tmp_path: Path) -> None:
+        """Repeat reads reuse the parse until the transcript grows."""
+        projects_dir = tmp_path / "projects"
+        slug_dir = projects_dir / "-test-project"
+        slug_dir.mkdir(parents=True)
+        transcript = slug_dir / "session-cached.jsonl"
+        line = json.dumps({"type": "user", "message": {"content": "First"}}) + "\n"
+        transcript.write_text(line)
+
+        kwargs = dict(
+            session_id="session-cached",
+            project_dir="/test/project",
+            projects_dir=projects_dir,
+        )
+        assert [m.text for m in read_session_transcript(**kwargs)] == ["First"]
+        with patch.object(Path, "open", side_effect=AssertionError("re-read")):
+            assert [m.text for m in read_session_transcript(**kwargs)] == ["First"]
+
+        with transcript.open("a") as f:
+            f.write(json.dumps({"type": "assistant", "message": {"content": "Ok"}}))
+        messages = read_session_transcript(**kwargs)
+        assert [m.text for m in messages] == ["First", "Ok"]
+
+
+class TestReadFirstMessage:
+    """Tests for reading the first user message of a transcript."""
+
+    def test_first_message_is_cached(self, tmp_path: Path) -> None:
+        """Once found, the first message is served without reopening the file."""
+        projects_dir = tmp_path / "projects"
+        slug_dir = projects_dir / "-test-project"
+        slug_dir.mkdir(parents=True)
+        (slug_dir / "session-cache.jsonl").write_text(
+            json.dumps(
+                {"type": "user", "message": {"role": "user", "content": "<system>"}}
+            )
+            + "\n"
+            + json.dumps(
+                {"type": "user", "message": {"role": "user", "content": "Fix it"}}
+            )
+            + "\n"
+        )
+
+        kwargs = dict(
+            session_id="session-cache",
+            project_dir="/test/project",
+            projects_dir=projects_dir,
+        )
+        assert read_first_message(**kwargs) == "Fix it"
+        with patch.object(Path, "open", side_effect=AssertionError("re-read")):
+            assert read_first_message(**kwargs) == "Fix it"
+
+    def test_missing_transcript_is_not_cached(self, tmp_path: Path) -> None:
+        """A transcript that appears later is still picked up."""
+        projects_dir = tmp_path / "projects"
+        slug_dir = projects_dir / "-test-project"
+        slug_dir.mkdir(parents=True)
+        kwargs = dict(
+            session_id="session-late",
+            project_dir="/test/project",
+            projects_dir=projects_dir,
+        )
+        assert read_first_message(**kwargs) is None
+
+        (slug_dir / "session-late.jsonl").write_text(
+            json.dumps({"type": "user", "message": {"role": "user", "content": "Hi"}})
+            + "\n"
+        )
+        assert read_first_message(**kwargs) == "Hi"
+
+    def test_deleted_transcript_drops_cached_message(self, tmp_path: Path) -> None:
+        """A cached first message is not served once the transcript is gone."""
+        projects_dir = tmp_path / "projects"
+        slug_dir = projects_dir / "-test-project"
+        slug_dir.mkdir(parents=True)
+        transcript = slug_dir / "session-gone.jsonl"
+        transcript.write_text(
+            json.dumps({"type": "user", "message": {"role": "user", "content": "Hi"}})
+            + "\n"
+        )
+        kwargs = dict(
+            session_id="session-gone",
+            project_dir="/test/project",
+            projects_dir=projects_dir,
+        )
+        assert read_first_message(**kwargs) == "Hi"
+
+        transcript.unlink()
+        assert read_first_message(**kwargs) is None
+
 
 class TestAppendHistoryEntry:
     """Tests for appending to history.jsonl."""
@@ -123,6 +123,25 @@ class TestGetOrConnect:
 
         chat_session_repo.get.assert_awaited_once_with(100, 42)
 
+    @pytest.mark.asyncio
+    async def test_reconnect_with_session_skips_repo(self, manager, chat_session_repo):
+        """A row without a model preference is only read once per key."""
+        with patch(
+            "src.claude.client_manager.UserClient",
+            side_effect=[make_mock_client("s1"), make_mock_client("s1")],
+        ):
+            for _ in range(2):
+                await manager.get_or_connect(
+                    user_id=1,
+                    chat_id=100,
+                    message_thread_id=42,
+                    directory="/proj",
+                    session_id="s1",
+                )
+                manager._clients[(1, 100, 42)].is_connected = False
+
+        chat_session_repo.get.assert_awaited_once_with(100, 42)
+
     @pytest.mark.asyncio
     async def test_skips_repo_lookup_when_force_new(self, manager, chat_session_repo):
         mock_client = make_mock_client()
@@ -227,6 +227,42 @@ class TestMultiRootDirectorySupport:
             else:
                 os.environ.pop("APPROVED_DIRECTORIES", None)
 
+    @pytest.mark.asyncio
+    async def test_status_names_containing_workspace(
+        self, multi_root_tmpdir, mock_deps, mock_update_and_context
+    ):
+        """/status reports the approved root that holds the current directory."""
+        import os
+
+        old_env = os.environ.get("APPROVED_DIRECTORIES")
+        os.environ["APPROVED_DIRECTORIES"] = (
+            f"{multi_root_tmpdir['root1']},{multi_root_tmpdir['root2']}"
+        )
+
+        try:
+            settings = create_test_config(
+                approved_directory=str(multi_root_tmpdir["root1"]),
+                approved_directories_str=(
+                    f"{multi_root_tmpdir['root1']},{multi_root_tmpdir['root2']}"
+                ),
+            )
+
+            update, context = mock_update_and_context
+            context.bot_data = mock_deps
+            root2 = settings.approved_directories[1]
+            context.user_data["current_directory"] = root2 / "project_c"
+
+            orchestrator = MessageOrchestrator(settings, mock_deps)
+            await orchestrator.handle_status(update, context)
+
+            message_text = update.message.reply_text.call_args[0][0]
+            assert "<b>Workspace:</b> workspace2" in message_text
+        finally:
+            if old_env is not None:
+                os.environ["APPROVED_DIRECTORIES"] = old_env
+            else:
+                os.environ.pop("APPROVED_DIRECTORIES", None)
+
 
 class TestDirectoryPersistence:
     """Test directory persistence across sessions."""
@@ -324,6 +324,32 @@ class TestAuditLogger:
         assert event.details["execution_time"] == 0.5
         assert event.details["exit_code"] == 0
 
+    async def test_enqueue_command_stores_in_batches(self, audit_logger, storage):
+        """Test queued commands are written together by the background task."""
+        batches = []
+        store_events = storage.store_events
+
+        async def recording_store_events(events):
+            batches.append(len(events))
+            await store_events(events)
+
+        storage.store_events = recording_store_events
+
+        for i in range(3):
+            audit_logger.enqueue_command(
+                user_id=123, command="cd", args=[f"/p{i}"], success=True
+            )
+        assert storage.events == []
+
+        await audit_logger.close()
+
+        assert batches == [3]
+        assert [e.details["args"] for e in storage.events] == [
+            ["/p0"],
+            ["/p1"],
+            ["/p2"],
+        ]
+
     async def test_log_command_risk_assessment(self, audit_logger, storage):
         """Test command risk assessment."""
         # Test high-risk command
@@ -21,17 +21,11 @@ class TestUserClientMultimodal:
 
     def test_work_item_with_attachments(self) -> None:
         att = Attachment(
-            content_block={
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/png",
-                    "data": "abc",
-                },
-            },
             filename="test.png",
             size=100,
             media_type="image/png",
+            kind="image",
+            data=b"abc",
         )
         q = Query(text="look at this", attachments=(att,))
         loop = asyncio.new_event_loop()
@@ -42,10 +36,11 @@ class TestUserClientMultimodal:
 
     def test_work_item_query_only_no_text(self) -> None:
         att = Attachment(
-            content_block={"type": "text", "text": "doc content"},
             filename="doc.txt",
             size=50,
             media_type="text/plain",
+            kind="document",
+            data="doc content",
         )
         q = Query(attachments=(att,))
         loop = asyncio.new_event_loop()
@@ -63,13 +58,14 @@ class TestUserClientMultimodal:
     def test_query_to_content_blocks_with_image(self) -> None:
         image_block = {
             "type": "image",
-            "source": {"type": "base64", "media_type": "image/jpeg", "data": "xyz"},
+            "source": {"type": "base64", "media_type": "image/jpeg", "data": "eHl6"},
         }
         att = Attachment(
-            content_block=image_block,
             filename="photo.jpg",
             size=200,
             media_type="image/jpeg",
+            kind="image",
+            data=b"xyz",
         )
         q = Query(text="describe this", attachments=(att,))
         blocks = q.to_content_blocks()